@@ -0,0 +1,119 @@
+"""
+Concurrent throughput of the Item API: sync handlers under WSGI vs async handlers under ASGI.
+
+    python benchmarks/bench_asgi_vs_wsgi.py [--clients 500] [--duration 15] [--threads 8]
+
+wsgi: gunicorn, 1 worker x `--threads` threads  -> GET /api/myapp/items/{id} (myapp/api.py)
+asgi: uvicorn, 1 worker, 1 event loop            -> GET /api/myapp/async/items/{id} (myapp/controllers/items_async.py)
+
+Every client keeps one keep-alive connection open and sends requests back to back for
+`--duration` seconds, cycling through item ids. Reports req/s, latency percentiles and errors.
+Needs uvicorn and gunicorn installed.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.servers import run_server
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    """Read one HTTP/1.1 response (content-length or chunked); return the status code"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def client(base_url: str, path_template: str, items: int, offset: int, deadline: float, stats: dict):
+    url = urlsplit(base_url)
+    try:
+        reader, writer = await asyncio.open_connection(url.hostname, url.port)
+    except OSError:
+        stats["errors"] += 1
+        return
+    n = offset
+    try:
+        while time.monotonic() < deadline:
+            path = path_template.format(id=n % items + 1)
+            n += 1
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\n\r\n".encode())
+            await writer.drain()
+            status = await read_response(reader)
+            stats["latencies"].append(time.perf_counter() - start)
+            if status != 200:
+                stats["errors"] += 1
+    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+        stats["errors"] += 1
+    finally:
+        writer.close()
+
+
+async def load(base_url: str, path_template: str, clients: int, duration: float, items: int) -> dict:
+    stats = {"latencies": [], "errors": 0}
+    deadline = time.monotonic() + duration
+    await asyncio.gather(*(
+        client(base_url, path_template, items, offset, deadline, stats) for offset in range(clients)
+    ))
+    latencies = sorted(stats["latencies"])
+    quantile = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / duration,
+        "p50_ms": quantile(0.50),
+        "p99_ms": quantile(0.99),
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "errors": stats["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads for the WSGI run")
+    parser.add_argument("--items", type=int, default=1000)
+    args = parser.parse_args()
+
+    runs = [
+        ("wsgi", 8201, "/api/myapp/items/{id}"),
+        ("asgi", 8202, "/api/myapp/async/items/{id}"),
+    ]
+    print(f"{args.clients} concurrent clients, {args.duration:.0f}s per run")
+    print(f"{'server':<6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for kind, port, path in runs:
+        with run_server(kind, port, threads=args.threads, items=args.items) as base_url:
+            result = asyncio.run(load(base_url, path, args.clients, args.duration, args.items))
+        print(f"{kind:<6} {result['rps']:>9.0f} {result['p50_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: CPU per ticker tick, one generator per client vs the broadcast hub.
+
+    python benchmarks/bench_broadcast_hub.py [ticks]
+
+old: every client runs its own loop: random value + EventData JSON + its own timer
+new: myapp.api.ticker_event once per tick, fanned out by my_sse_app.broadcast.BroadcastHub
+
+All clients are coroutines on one event loop that read as fast as events arrive, so
+only the cost of producing and delivering the events is measured.
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from myapp.api import ticker_event
+from myapp.schema.Event import EventData
+from my_sse_app.broadcast import BroadcastHub
+
+INTERVAL = 0.05
+
+
+async def old_event_stream():
+    """the per-client generator /myapp/sse used before the hub"""
+    while True:
+        data = EventData(
+            timestamp=datetime.now().strftime('%H:%M:%S'),
+            value=random.randint(1, 100)
+        )
+        yield f"data: {data.json()}\n\n"
+        await asyncio.sleep(INTERVAL)
+
+
+async def consume(stream, ticks):
+    for _ in range(ticks):
+        await stream.__anext__()
+    await stream.aclose()
+
+
+async def run(make_stream, clients, ticks):
+    await asyncio.gather(*(consume(make_stream(), ticks) for _ in range(clients)))
+
+
+def cpu_per_tick(make_stream, clients, ticks):
+    start = time.process_time()
+    asyncio.run(run(make_stream, clients, ticks))
+    return (time.process_time() - start) / ticks
+
+
+def main():
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{ticks} ticks, CPU time per tick (whole process)")
+    print(f"{'clients':>8} {'old ms':>8} {'hub ms':>8}")
+    for clients in (10, 100, 1000, 5000):
+        hub = BroadcastHub(ticker_event, interval=INTERVAL, queue_size=ticks)
+        old = cpu_per_tick(old_event_stream, clients, ticks)
+        new = cpu_per_tick(hub.stream, clients, ticks)
+        print(f"{clients:>8} {old * 1000:>8.2f} {new * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
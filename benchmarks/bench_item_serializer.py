@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: old Item serialization round trip vs the single-pass serializer.
+
+    python benchmarks/bench_item_serializer.py [rows]
+
+old: serialize('json') -> json.loads -> json.dumps (what JsonResponse does)
+new: .values() dicts   -> myapp.serializers.iter_json_array
+
+No database needed; both paths start from rows that are already in memory,
+so only the serialization cost is measured.
+"""
+import os
+import sys
+import json
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from django.core.serializers import serialize
+from myapp.models import Item
+from myapp.serializers import iter_json_array
+
+
+def old_path(items):
+    return json.dumps({"items": json.loads(serialize('json', items))})
+
+
+def new_path(rows):
+    return '{"items":[' + "".join(iter_json_array(rows)) + ']}'
+
+
+def best_of(fn, arg, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(count: int):
+    description = "lorem ipsum dolor sit amet " * 10
+    items = [Item(id=i, name=f"Item {i}", description=description) for i in range(count)]
+    rows = [{"id": i, "name": f"Item {i}", "description": description} for i in range(count)]
+
+    old = best_of(old_path, items)
+    new = best_of(new_path, rows)
+    print(f"rows: {count}")
+    print(f"old round trip : {old / count * 1e6:8.2f} us/item")
+    print(f"single pass    : {new / count * 1e6:8.2f} us/item")
+    print(f"speedup        : {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
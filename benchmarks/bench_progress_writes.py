@@ -0,0 +1,98 @@
+"""
+SubTask UPDATE statements per task run: a write per progress tick vs the coalesced writer.
+
+    python benchmarks/bench_progress_writes.py [tasks] [--workers 8] [--interval-ms 1000]
+
+Runs `tasks` simulated tasks (3 subtasks x 6 progress events each) at once on a worker
+pool of `--workers` threads against a throwaway sqlite database, and counts the UPDATE
+statements that hit my_sse_app_subtask.
+
+per tick : ProgressWriter(interval=0), every record is written on its own (the old save())
+coalesced: ProgressWriter(interval=--interval-ms), ticks merged, pending rows bulk_updated
+
+The task bus is left out (events are generated and dropped) so only db writes are measured.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.servers import server_env, prepare_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tasks", type=int, nargs="?", default=64)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--interval-ms", type=float, default=1000)
+    parser.add_argument("--work-delay", type=float, default=0.2, help="seconds per simulated progress step")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = server_env(os.path.join(tmp, "bench.sqlite3"))
+        prepare_database(env, items=0)
+        os.environ.update(env)
+
+        import django
+
+        django.setup()
+
+        from django.db.backends.signals import connection_created
+        from my_sse_app.controllers import task as task_controller
+        from my_sse_app.models import Task, SubTask
+        from my_sse_app.progress import ProgressWriter
+        from my_sse_app.workers import WorkerPool
+
+        updates = {"count": 0}
+        lock = threading.Lock()
+
+        def count_updates(execute, sql, params, many, context):
+            if sql.startswith('UPDATE "my_sse_app_subtask"'):
+                with lock:
+                    updates["count"] += 1
+            return execute(sql, params, many, context)
+
+        def install_counter(sender, connection, **kwargs):
+            connection.execute_wrappers.append(count_updates)
+
+        connection_created.connect(install_counter)
+        task_controller.WORK_DELAY = args.work_delay
+
+        def run_subtasks(task_id):
+            for subtask in SubTask.objects.filter(task_id=task_id).order_by('order'):
+                for _ in task_controller.process_subtask(task_id, subtask.name):
+                    pass
+
+        def run(interval):
+            task_controller.progress_writer = ProgressWriter(interval=interval)
+            tasks = [Task.objects.create(status='processing') for _ in range(args.tasks)]
+            SubTask.objects.bulk_create([
+                SubTask(task=task, name=name, order=order)
+                for task in tasks
+                for order, name in enumerate(["Data Validation", "Data Processing", "Report Generation"])
+            ])
+            pool = WorkerPool(size=args.workers)
+            updates["count"] = 0
+            start = time.perf_counter()
+            for task in tasks:
+                pool.submit(run_subtasks, task.id)
+            pool.join()
+            elapsed = time.perf_counter() - start
+            pool.shutdown()
+            assert not SubTask.objects.filter(task__in=tasks).exclude(status='completed').exists()
+            return updates["count"], elapsed
+
+        print(f"{args.tasks} tasks on {args.workers} workers, {args.work_delay}s per progress step")
+        print(f"{'writer':<10} {'UPDATEs':>8} {'per task':>9} {'seconds':>8}")
+        for label, interval in (("per tick", 0), ("coalesced", args.interval_ms / 1000)):
+            count, elapsed = run(interval)
+            print(f"{label:<10} {count:>8} {count / args.tasks:>9.1f} {elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Bandwidth of an SSE connection: uncompressed vs my_sse_app.streaming.compress_stream.
+
+    python benchmarks/bench_sse_compression.py [events] [--level 6]
+
+Feeds `events` frames of each kind through compress_stream the way a connection sees
+them - one chunk per event, each followed by a sync flush so it is decodable on arrival -
+and reports bytes on the wire per event, plus the CPU cost of compressing.
+
+chat session : ChatbotEventData frames from /api/sse/chat-session
+ticker       : EventData frames from the /api/sse broadcast hub
+task progress: task event dicts with stream ids, as /tasks/{id}/progress sends them
+
+No server involved; HTTP/TLS framing is the same with or without compression and is left out.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from myapp.api import ticker_event
+from my_sse_app.api import create_task_event
+from my_sse_app.controllers.task import create_event
+from my_sse_app.sse import encode
+from my_sse_app.streaming import ENCODINGS, compress_stream
+
+def chat_frames(count):
+    return [encode(create_task_event(n // 2 % 3 + 1, ("task_start", "task_completed")[n % 2])) for n in range(count)]
+
+
+def ticker_frames(count):
+    return [ticker_event() for _ in range(count)]
+
+
+def task_frames(count):
+    names = ["Data Validation", "Data Processing", "Report Generation"]
+    return [encode(create_event("6b1f7c1e-0000-4000-8000-000000000000", names[n // 6 % 3], "processing",
+                                n % 6 * 20, f"{names[n // 6 % 3]} in progress: {n % 6 * 20}%"),
+                   id=f"{1718000000000 + n}-0")
+            for n in range(count)]
+
+
+async def from_list(frames):
+    for frame in frames:
+        yield frame
+
+
+async def compressed_size(frames, encoding, level):
+    size = 0
+    async for chunk in compress_stream(from_list(frames), encoding, level):
+        size += len(chunk)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("events", type=int, nargs="?", default=10000)
+    parser.add_argument("--level", type=int, default=6)
+    args = parser.parse_args()
+
+    print(f"{args.events} events per connection, zlib level {args.level}, bytes per event")
+    print(f"{'stream':<14} {'raw':>6} " + " ".join(f"{name:>8} {'saved':>6}" for name in ENCODINGS)
+          + f" {'us/event':>9}")
+    for label, make in (("chat session", chat_frames), ("ticker", ticker_frames), ("task progress", task_frames)):
+        frames = make(args.events)
+        raw = sum(len(frame.encode()) for frame in frames)
+        row = f"{label:<14} {raw / args.events:>6.1f} "
+        for encoding in ENCODINGS:
+            start = time.perf_counter()
+            size = asyncio.run(compressed_size(frames, encoding, args.level))
+            elapsed = time.perf_counter() - start
+            row += f"{size / args.events:>8.1f} {1 - size / raw:>6.0%} "
+        print(row + f"{elapsed / args.events * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+How many concurrent SSE clients one worker process can hold.
+
+    python benchmarks/bench_sse_connections.py [--clients 2000] [--timeout 10] [--threads 8]
+
+Opens `--clients` connections to GET /api/myapp/sse and counts how many receive their
+first event within `--timeout` seconds, all connections being held open at once.
+
+wsgi: gunicorn, 1 worker x `--threads` threads. Every open stream occupies a thread for
+      its whole life (this is how the old time.sleep generators were served), so only
+      `--threads` clients get events, the rest wait in the accept queue.
+asgi: uvicorn, 1 worker. Between events a stream is a suspended coroutine.
+
+Also reports the server's RSS (worker + parent) with all clients connected.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.servers import run_server
+
+PATH = "/api/myapp/sse"
+
+
+def rss_kb(pid: int) -> int:
+    """RSS of `pid` and all its descendants, from /proc (linux only)"""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as status:
+                for line in status:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as children:
+                    pending += [int(child) for child in children.read().split()]
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return total
+
+
+async def subscribe(base_url: str, first_event: asyncio.Event, hold: asyncio.Event, results: dict):
+    url = urlsplit(base_url)
+    writer = None
+    try:
+        reader, writer = await asyncio.open_connection(url.hostname, url.port)
+        writer.write(f"GET {PATH} HTTP/1.1\r\nHost: {url.netloc}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        start = time.perf_counter()
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("closed")
+            if b"data:" in line:
+                break
+        results["connected"] += 1
+        results["ttfe"].append(time.perf_counter() - start)
+        await hold.wait()
+    except (OSError, ConnectionError, asyncio.CancelledError):
+        results["failed"] += 1
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def hold_connections(base_url: str, pid: int, clients: int, timeout: float) -> dict:
+    results = {"connected": 0, "failed": 0, "ttfe": []}
+    hold = asyncio.Event()
+    tasks = [asyncio.create_task(subscribe(base_url, asyncio.Event(), hold, results)) for _ in range(clients)]
+    await asyncio.sleep(timeout)
+    results["rss_kb"] = rss_kb(pid)
+    hold.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads for the WSGI run")
+    args = parser.parse_args()
+
+    print(f"{args.clients} SSE clients on {PATH}, {args.timeout:.0f}s to get a first event")
+    print(f"{'server':<6} {'streaming':>10} {'waiting':>8} {'rss MB':>8} {'ttfe p50 ms':>12}")
+    for kind, port in (("wsgi", 8301), ("asgi", 8302)):
+        with run_server(kind, port, threads=args.threads, items=0) as server:
+            result = asyncio.run(hold_connections(server, server.pid, args.clients, args.timeout))
+        ttfe = sorted(result["ttfe"])
+        p50 = ttfe[len(ttfe) // 2] * 1000 if ttfe else float("nan")
+        waiting = args.clients - result["connected"]
+        print(f"{kind:<6} {result['connected']:>10} {waiting:>8} {result['rss_kb'] / 1024:>8.1f} {p50:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: SSE frame encoding, old f-string paths vs my_sse_app.sse.
+
+    python benchmarks/bench_sse_encoder.py [events]
+
+old: f"data: {event.json()}\\n\\n" for models, f"data: {json.dumps(event)}\\n\\n" for dicts,
+     one chunk per event
+new: sse.encode(event) (pydantic-core serializer), frames packed 16 per chunk with sse.pack
+
+Single thread, so the numbers are events/sec per core. No server involved.
+"""
+import json
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from my_sse_app.api import create_task_event
+from my_sse_app.controllers.task import create_event
+from my_sse_app.sse import encode, pack
+
+BATCH = 16
+warnings.simplefilter("ignore")  # .json() is deprecated in pydantic 2, which is part of why it's slow
+
+
+def old_model(events):
+    return [f"data: {event.json()}\n\n" for event in events]
+
+
+def old_dict(events):
+    return [f"data: {json.dumps(event)}\n\n" for event in events]
+
+
+def new(events):
+    return [pack(encode(event) for event in events[i:i + BATCH]) for i in range(0, len(events), BATCH)]
+
+
+def events_per_second(fn, events, repeat=5):
+    best = min(timed(fn, events) for _ in range(repeat))
+    return len(events) / best
+
+
+def timed(fn, events):
+    start = time.perf_counter()
+    fn(events)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    models = [create_task_event(n % 3 + 1, "task_start") for n in range(count)]
+    dicts = [create_event("6b1f7c1e-0000-4000-8000-000000000000", "Data Processing", "processing", n % 100,
+                          f"Data Processing in progress: {n % 100}%") for n in range(count)]
+
+    print(f"{count} events, events/sec on one core (chunks written)")
+    print(f"{'event':<16} {'old':>12} {'new':>12} {'speedup':>8}")
+    for label, events, old in (("ChatbotEventData", models, old_model), ("task event dict", dicts, old_dict)):
+        before = events_per_second(old, events)
+        after = events_per_second(new, events)
+        print(f"{label:<16} {before:>12,.0f} {after:>12,.0f} {after / before:>7.1f}x")
+    print(f"chunks per {count} events: old {count}, new {len(new(models))}")
+
+
+if __name__ == "__main__":
+    main()
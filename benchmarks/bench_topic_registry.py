@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: cost of open per-project channels in my_sse_app.topics.TopicRegistry.
+
+    python benchmarks/bench_topic_registry.py [topics] [--subscribers 1]
+
+Opens `topics` keys with `--subscribers` connections each (coroutines on one event loop,
+like uvicorn's), on sources that stay idle, and reports:
+  - memory per open topic (tracemalloc, everything the registry, topics, subscriptions
+    and source coroutines allocate)
+  - subscribe / unsubscribe time per connection
+  - what is left once every connection closed (should be nothing)
+No server involved.
+"""
+import argparse
+import asyncio
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django
+
+django.setup()
+
+from my_sse_app.topics import TopicRegistry
+
+
+async def idle_source(key):
+    """a project with nothing happening"""
+    await asyncio.sleep(3600)
+    yield key
+
+
+async def open_all(registry, keys, subscribers):
+    opened = [(key, *registry.subscribe(key)) for key in keys for _ in range(subscribers)]
+    await asyncio.sleep(0.5)  # let every source start and suspend
+    return opened
+
+
+async def close_all(registry, opened):
+    for key, topic, subscription in opened:
+        registry.unsubscribe(key, topic, subscription)
+    await asyncio.sleep(2)  # cancelled sources finish on the registry's loop
+    gc.collect()  # a cancelled task and its future reference each other
+
+
+async def main(topics, subscribers):
+    registry = TopicRegistry(idle_source)
+    keys = [(user_id, project_id) for user_id in range(topics // 100 + 1) for project_id in range(100)][:topics]
+    connections = topics * subscribers
+
+    # timings, without tracemalloc slowing every allocation down
+    start = time.perf_counter()
+    opened = [(key, *registry.subscribe(key)) for key in keys for _ in range(subscribers)]
+    subscribe_time = time.perf_counter() - start
+    await asyncio.sleep(0.5)
+    stats = registry.get_stats()
+    start = time.perf_counter()
+    for key, topic, subscription in opened:
+        registry.unsubscribe(key, topic, subscription)
+    unsubscribe_time = time.perf_counter() - start
+    del opened
+    await asyncio.sleep(0.5)
+
+    # memory: the first round above already grew the loop's internal tables to their peak size
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    opened = await open_all(registry, keys, subscribers)
+    open_memory = tracemalloc.get_traced_memory()[0] - before
+    await close_all(registry, opened)
+    del opened
+    left_memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{stats['topics']} topics, {stats['subscribers']} connections open")
+    print(f"memory per open topic      {open_memory / topics:>10,.0f} bytes")
+    print(f"subscribe per connection   {subscribe_time / connections * 1e6:>10.1f} us")
+    print(f"unsubscribe per connection {unsubscribe_time / connections * 1e6:>10.1f} us")
+    print(f"after all closed: {registry.get_stats()['topics']} topics, {left_memory:,} bytes still allocated")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("topics", type=int, nargs="?", default=20000)
+    parser.add_argument("--subscribers", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(main(args.topics, args.subscribers))
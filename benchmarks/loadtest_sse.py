@@ -0,0 +1,324 @@
+"""
+SSE load test: how many concurrent event-stream clients a server sustains, and at what cost.
+
+    python benchmarks/loadtest_sse.py [--target ticker] [--clients 100,1000,5000]
+                                      [--ramp 5] [--hold 20] [--server asgi | --url http://... --pid N]
+                                      [--report sse-load.json] [--baseline previous.json --tolerance 0.2]
+
+For every step in `--clients`, opens that many connections to the target over `--ramp`
+seconds, holds them for `--hold` seconds, then closes them all. Per step it records:
+
+  ttfe        time from sending the request to the first `data:` line
+  gaps        time between consecutive events on one connection, and for targets with a
+              fixed interval the jitter (gap - interval)
+  connections held (still streaming when the step ended), completed (the stream ended on
+              its last event), dropped (closed or reset by the server mid-stream), failed
+              (never got a 200 + first event)
+  rss         server RSS (process + children, from /proc) before the step and its peak
+              while connected; per connection = (peak - before) / connections that got an event
+
+Targets:
+  ticker        GET /api/myapp/sse, the broadcast ticker (an event every 2s)
+  chat-session  GET /api/sse/chat-session, one simulated session per connection (~17s, 8 events)
+  project-chat  GET /api/sse-projects/users/{u}/projects/{p}/chat-session, connections
+                spread over --projects topics (my_sse_app/topics.py)
+
+The report (`--report`) is JSON: run metadata (git commit, server, target, options) and
+one entry per step. With `--baseline` the run is compared to an earlier report and the
+script exits with status 1 if ttfe p95, gap p95 or RSS per connection regressed by more
+than `--tolerance`, or if it dropped/failed more connections.
+
+By default a fresh server is started for the run (see servers.py); `--url` (and `--pid`
+for RSS) points it at one that's already running. Linux only (RSS from /proc).
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_sse_connections import rss_kb
+from benchmarks.servers import ROOT, run_server
+
+CONNECT_TIMEOUT = 10  # seconds for the TCP connect + response headers
+
+
+class Target:
+    def __init__(self, path: str, interval: Optional[float] = None, last_event: Optional[bytes] = None):
+        self.path = path
+        self.interval = interval  # nominal seconds between events, when there is one
+        self.last_event = last_event  # marker of the event a finite stream ends with
+
+    def path_for(self, n: int, projects: int) -> str:
+        return self.path.format(user=n % projects // 100 + 1, project=n % projects % 100 + 1)
+
+
+TARGETS = {
+    "ticker": Target("/api/myapp/sse", interval=2.0),
+    "chat-session": Target("/api/sse/chat-session", last_event=b'"chat_completed"'),
+    "project-chat": Target("/api/sse-projects/users/{user}/projects/{project}/chat-session",
+                           last_event=b'"chat_completed"'),
+}
+
+
+class Connection:
+    """What one client saw"""
+
+    __slots__ = ("status", "ttfe", "gaps", "events", "error")
+
+    def __init__(self):
+        self.status = "failed"  # -> held | completed | dropped
+        self.ttfe: Optional[float] = None
+        self.gaps: List[float] = []
+        self.events = 0
+        self.error: Optional[str] = None
+
+
+async def stream(base_url: str, path: str, target: Target, connection: Connection):
+    url = urlsplit(base_url)
+    writer = None
+    try:
+        start = time.perf_counter()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(url.hostname, url.port), CONNECT_TIMEOUT)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {url.netloc}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), CONNECT_TIMEOUT)
+        if b" 200 " not in status_line:
+            connection.error = status_line.decode(errors="replace").strip() or "no response"
+            return
+        last = None
+        while True:
+            line = await reader.readline()
+            if not line:
+                if connection.events:
+                    ended = target.last_event is not None and connection.status == "completed"
+                    connection.status = "completed" if ended else "dropped"
+                else:
+                    connection.error = "closed before the first event"
+                return
+            if not line.startswith(b"data:"):
+                continue  # headers, chunk sizes, comments
+            now = time.perf_counter()
+            if last is None:
+                connection.ttfe = now - start
+            else:
+                connection.gaps.append(now - last)
+            last = now
+            connection.events += 1
+            connection.status = "completed" if target.last_event and target.last_event in line else "held"
+    except asyncio.CancelledError:
+        # end of the step: the status says where the connection was
+        if not connection.events:
+            connection.error = "no event before the step ended"
+    except (OSError, asyncio.TimeoutError) as e:
+        if connection.events:
+            connection.status = "dropped"
+        connection.error = type(e).__name__
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def percentiles(values: List[float], scale: float = 1000) -> Dict[str, Optional[float]]:
+    """p50 / p95 / p99 / max, in ms by default"""
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    values = sorted(values)
+
+    def at(q):
+        return round(values[min(len(values) - 1, int(q * len(values)))] * scale, 2)
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": round(values[-1] * scale, 2)}
+
+
+async def run_step(base_url: str, pid: Optional[int], target: Target, clients: int, ramp: float, hold: float,
+                   projects: int) -> Dict:
+    rss_before = rss_kb(pid) if pid else None
+    rss_peak = rss_before
+    connections = [Connection() for _ in range(clients)]
+    tasks = []
+    started = time.perf_counter()
+    for n, connection in enumerate(connections):
+        tasks.append(asyncio.create_task(stream(base_url, target.path_for(n, projects), target, connection)))
+        # ! spread over the ramp: a burst of thousands of SYNs measures the accept queue, not the server
+        await asyncio.sleep(ramp / clients)
+    deadline = time.perf_counter() + hold
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(min(1, max(0, deadline - time.perf_counter())))
+        if pid:
+            rss_peak = max(rss_peak, rss_kb(pid))
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    counts = {status: 0 for status in ("held", "completed", "dropped", "failed")}
+    for connection in connections:
+        counts[connection.status] += 1
+    streamed = clients - counts["failed"]
+    gaps = [gap for connection in connections for gap in connection.gaps]
+    errors: Dict[str, int] = {}
+    for connection in connections:
+        if connection.error:
+            errors[connection.error] = errors.get(connection.error, 0) + 1
+    step = {
+        "clients": clients,
+        **counts,
+        "events": sum(connection.events for connection in connections),
+        "seconds": round(time.perf_counter() - started, 2),
+        "ttfe_ms": percentiles([connection.ttfe for connection in connections if connection.ttfe is not None]),
+        "gap_ms": percentiles(gaps),
+        "jitter_ms": percentiles([abs(gap - target.interval) for gap in gaps]) if target.interval else None,
+        "rss_kb": {"before": rss_before, "peak": rss_peak},
+        "rss_per_connection_kb": round((rss_peak - rss_before) / streamed, 2) if pid and streamed else None,
+        "errors": errors,
+    }
+    return step
+
+
+def raise_fd_limit(clients: int):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, clients + 256) if hard != resource.RLIM_INFINITY else clients + 256
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Regression check against an earlier report -----------------------------------------
+
+CHECKS = (("ttfe_ms", "p95"), ("gap_ms", "p95"), ("rss_per_connection_kb", None))
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of `report` vs `baseline`, step by step (matched on client count)"""
+    previous = {step["clients"]: step for step in baseline["steps"]}
+    regressions = []
+    for step in report["steps"]:
+        before = previous.get(step["clients"])
+        if before is None:
+            continue
+        for metric, key in CHECKS:
+            new, old = step[metric], before[metric]
+            if key is not None:
+                new, old = (new or {}).get(key), (old or {}).get(key)
+            if new is not None and old and new > old * (1 + tolerance):
+                label = f"{metric}.{key}" if key else metric
+                regressions.append(f"{step['clients']} clients: {label} {old} -> {new}")
+        lost, lost_before = step["dropped"] + step["failed"], before["dropped"] + before["failed"]
+        if lost > lost_before:
+            regressions.append(f"{step['clients']} clients: dropped+failed {lost_before} -> {lost}")
+    return regressions
+
+
+def print_step(step: Dict):
+    ttfe, gap = step["ttfe_ms"], step["gap_ms"]
+    per_connection = step["rss_per_connection_kb"]
+    print(f"{step['clients']:>7} {step['held'] + step['completed']:>7} {step['dropped']:>7} {step['failed']:>7} "
+          f"{ttfe['p50'] or float('nan'):>9.1f} {ttfe['p95'] or float('nan'):>9.1f} "
+          f"{gap['p95'] or float('nan'):>9.1f} "
+          f"{per_connection if per_connection is not None else float('nan'):>9.1f}")
+
+
+async def warm_up(base_url: str, target: Target, timeout: float = 30):
+    """One stream up to its first event: the first request pays for Django's lazy imports, no step should"""
+    connection = Connection()
+    task = asyncio.create_task(stream(base_url, target.path_for(0, 1), target, connection))
+    deadline = time.perf_counter() + timeout
+    while not connection.events and not task.done() and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def run(base_url: str, pid: Optional[int], target: Target, args) -> List[Dict]:
+    await warm_up(base_url, target)
+    steps = []
+    for clients in args.clients:
+        step = await run_step(base_url, pid, target, clients, args.ramp, args.hold, args.projects)
+        print_step(step)
+        steps.append(step)
+        await asyncio.sleep(args.cooldown)  # let the server tear the last step's streams down
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="ticker")
+    parser.add_argument("--clients", type=lambda value: [int(n) for n in value.split(",")], default=[100, 1000],
+                        help="comma-separated connection counts, one step each")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds to open a step's connections")
+    parser.add_argument("--hold", type=float, default=20, help="seconds to hold them once opened")
+    parser.add_argument("--cooldown", type=float, default=2, help="seconds between steps")
+    parser.add_argument("--projects", type=int, default=100, help="topics the project-chat target spreads over")
+    parser.add_argument("--server", choices=["asgi", "wsgi"], default="asgi", help="server started for the run")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads for --server wsgi")
+    parser.add_argument("--port", type=int, default=8311)
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="pid of the --url server, for RSS")
+    parser.add_argument("--report", default="sse-load-report.json", help="where the JSON report is written")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    target = TARGETS[args.target]
+    fd_limit = raise_fd_limit(max(args.clients))
+    if fd_limit < max(args.clients) + 64:
+        print(f"warning: open file limit is {fd_limit}, connections beyond that will fail", file=sys.stderr)
+
+    print(f"{args.target} ({target.path}), {args.ramp:.0f}s ramp, {args.hold:.0f}s hold")
+    print(f"{'clients':>7} {'streams':>7} {'dropped':>7} {'failed':>7} {'ttfe p50':>9} {'ttfe p95':>9} "
+          f"{'gap p95':>9} {'KB/conn':>9}")
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    if args.url:
+        server = args.url
+        steps = asyncio.run(run(args.url, args.pid, target, args))
+    else:
+        server = args.server
+        with run_server(args.server, args.port, threads=args.threads, items=0) as base_url:
+            steps = asyncio.run(run(base_url, base_url.pid, target, args))
+
+    report = {
+        "meta": {
+            "started_at": started_at,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "server": server,
+            "target": args.target,
+            "path": target.path,
+            "interval": target.interval,
+            "ramp": args.ramp,
+            "hold": args.hold,
+            "projects": args.projects if args.target == "project-chat" else None,
+        },
+        "steps": steps,
+    }
+    Path(args.report).write_text(json.dumps(report, indent=2))
+    print(f"report: {args.report}")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"no regression vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
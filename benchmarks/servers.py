@@ -0,0 +1,93 @@
+"""
+Start the project under a real server for the load benchmarks in this directory.
+
+    with run_server("asgi", port=8101) as base_url: ...
+
+asgi -> uvicorn config.asgi:application (one worker, one event loop)
+wsgi -> gunicorn config.wsgi:application (one worker, `threads` threads)
+
+Every run gets a throwaway sqlite database, migrated and seeded with `items` rows,
+so benchmarks never touch db.sqlite3 or a real postgres.
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def server_env(db_path: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DJANGO_SETTINGS_MODULE": "config.settings",
+        "DB_ENGINE": "django.db.backends.sqlite3",
+        "DB_NAME": db_path,
+        "PYTHONPATH": str(ROOT),
+    })
+    return env
+
+
+def prepare_database(env: dict, items: int) -> None:
+    subprocess.run([sys.executable, "manage.py", "migrate", "-v", "0"], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    seed = (
+        "from myapp.models import Item;"
+        f"Item.objects.bulk_create([Item(name=f'Item {{i}}', description='lorem ipsum ' * 20) for i in range({items})])"
+    )
+    subprocess.run([sys.executable, "manage.py", "shell", "-c", seed], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+def server_command(kind: str, port: int, threads: int) -> list:
+    if kind == "asgi":
+        return [sys.executable, "-m", "uvicorn", "config.asgi:application",
+                "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+                "--backlog", "4096", "--timeout-keep-alive", "60"]
+    if kind == "wsgi":
+        return [sys.executable, "-m", "gunicorn", "config.wsgi:application",
+                "--bind", f"127.0.0.1:{port}", "--workers", "1", "--threads", str(threads),
+                "--backlog", "4096", "--keep-alive", "60", "--log-level", "warning"]
+    raise ValueError(f"unknown server kind: {kind}")
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise TimeoutError(f"server on port {port} did not start")
+
+
+@contextmanager
+def run_server(kind: str, port: int, threads: int = 8, items: int = 1000):
+    """Yield the base url of a freshly started server; it is stopped on exit. Returns its pid as `.pid`"""
+    with tempfile.TemporaryDirectory() as tmp:
+        env = server_env(os.path.join(tmp, "bench.sqlite3"))
+        prepare_database(env, items)
+        process = subprocess.Popen(server_command(kind, port, threads), cwd=ROOT, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            yield ServerHandle(f"http://127.0.0.1:{port}", process.pid)
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+class ServerHandle(str):
+    """The base url, plus the pid of the server process (for RSS sampling)"""
+
+    def __new__(cls, base_url: str, pid: int):
+        handle = super().__new__(cls, base_url)
+        handle.pid = pid
+        return handle
@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
+
+Serve it with e.g. `uvicorn config.asgi:application`; async ninja handlers
+(myapp/controllers/items_async.py) then run on the event loop without a worker thread.
+WebSocket connections (my_sse_app/websocket.py) are routed here, next to Django;
+uvicorn needs the `websockets` package installed to accept them.
 """
 
 import os
@@ -13,4 +18,12 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from my_sse_app.websocket import websocket_application  # noqa: E402 - needs the apps loaded
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        return await websocket_application(scope, receive, send)
+    return await django_application(scope, receive, send)
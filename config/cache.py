@@ -0,0 +1,228 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Two-tier read-through cache --------------------------------------------------
+# ! L1: bounded LRU with a TTL, inside this process (no network at all)
+# ! L2: Redis at settings.REDIS_URL, shared by every worker
+# Shared by the apps (myapp's Item rows, my_sse_app's task snapshots): each owns its
+# instance, key and TTLs, and invalidates on its own writes. Other processes' L1 copies
+# can't be reached from here, so their staleness is bounded by the (short) L1 TTL
+#
+# ! A miss takes a fill lease in Redis before reading the db, and only stores the entry if
+# ! the lease is still there (WATCH / MULTI): invalidation deletes it along with the entry.
+# ! So a reader that SELECTed the old row before a write committed can't put it back after
+# ! the write's on_commit invalidation - it would otherwise live for the whole shared TTL.
+
+# after a Redis error we stop asking it for a while instead of paying a timeout per request
+SHARED_RETRY_AFTER = 30  # seconds
+
+# one shared encoder instance, so we don't rebuild it for every entry
+encode = DjangoJSONEncoder(separators=(",", ":")).encode
+
+
+class LRUCache:
+    """Thread-safe LRU with a per-entry TTL"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class ReadThroughCache:
+    """
+    Read-through cache of JSON-able dicts (rows, snapshots), stored under `key.format(id)`.
+    `shared` is any redis-py compatible client, or None to run with the local tier only
+    """
+
+    LEASE_KEY = "{}:fill"  # formatted with the entry's key
+
+    def __init__(self, key: str, shared: Optional[redis.Redis], local_max_size: int,
+                 local_ttl: float, shared_ttl: int):
+        self.key = key
+        self.local = LRUCache(local_max_size, local_ttl)
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self._shared_down_until = 0.0
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "shared_errors": 0,
+            "stale_fills": 0,  # loads not stored because a write invalidated the key meanwhile
+        }
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _shared_available(self) -> bool:
+        return self.shared is not None and time.monotonic() >= self._shared_down_until
+
+    def _shared_failed(self) -> None:
+        self._count("shared_errors")
+        self._shared_down_until = time.monotonic() + SHARED_RETRY_AFTER
+
+    def get_or_load(self, id_: Any, loader: Callable[[Any], Optional[Dict]], store: bool = True) -> Optional[Dict]:
+        """
+        Return the cached entry for `id_`, calling `loader` (the db) only when both tiers miss.
+        `store=False` for loaders returning partial entries (e.g. sparse fieldsets), which must not be cached
+        """
+        key = self.key.format(id_)
+
+        entry = self.local.get(key)
+        if entry is not None:
+            self._count("local_hits")
+            return entry
+
+        if self._shared_available():
+            try:
+                raw = self.shared.get(key)
+            except redis.RedisError:
+                self._shared_failed()
+                raw = None
+            if raw is not None:
+                entry = json.loads(raw)
+                self.local.set(key, entry)
+                self._count("shared_hits")
+                return entry
+
+        self._count("misses")
+        lease = self._take_lease(key) if store else None
+        entry = loader(id_)
+        if entry is None or not store:
+            return entry
+
+        self.local.set(key, entry)
+        if lease is not None:
+            self._fill(key, lease, entry)
+        return entry
+
+    def _take_lease(self, key: str) -> Optional[str]:
+        """Mark `key` as being loaded; None if Redis is unavailable (then nothing gets stored there)"""
+        if not self._shared_available():
+            return None
+        lease = uuid.uuid4().hex
+        try:
+            self.shared.set(self.LEASE_KEY.format(key), lease, ex=self.shared_ttl)
+        except redis.RedisError:
+            self._shared_failed()
+            return None
+        return lease
+
+    def _fill(self, key: str, lease: str, entry: Dict) -> None:
+        """Store `entry` unless `key` was invalidated (or reloaded by someone else) since the lease was taken"""
+        lease_key = self.LEASE_KEY.format(key)
+        try:
+            with self.shared.pipeline() as pipe:
+                pipe.watch(lease_key)
+                current = pipe.get(lease_key)
+                if isinstance(current, bytes):
+                    current = current.decode()
+                if current != lease:
+                    self._count("stale_fills")
+                    return
+                pipe.multi()
+                pipe.set(key, encode(entry), ex=self.shared_ttl)
+                pipe.delete(lease_key)
+                pipe.execute()
+        except redis.WatchError:
+            # invalidated between the check and the write
+            self._count("stale_fills")
+        except redis.RedisError:
+            self._shared_failed()
+
+    async def aget_or_load(self, id_: Any, aloader: Callable[[Any], Awaitable[Optional[Dict]]],
+                           store: bool = True) -> Optional[Dict]:
+        """
+        Async twin of `get_or_load` for ASGI handlers. Only the in-process tier is used:
+        our redis client is blocking and would stall the event loop
+        """
+        key = self.key.format(id_)
+
+        entry = self.local.get(key)
+        if entry is not None:
+            self._count("local_hits")
+            return entry
+
+        self._count("misses")
+        entry = await aloader(id_)
+        if entry is not None and store:
+            self.local.set(key, entry)
+        return entry
+
+    def invalidate_many(self, ids: Iterable[Any]) -> None:
+        keys = [self.key.format(id_) for id_ in ids]
+        if not keys:
+            return
+        for key in keys:
+            self.local.delete(key)
+            self._count("invalidations")
+        if self._shared_available():
+            try:
+                # ! the leases too: a load already in flight may have read the old entry
+                self.shared.delete(*keys, *(self.LEASE_KEY.format(key) for key in keys))
+            except redis.RedisError:
+                self._shared_failed()
+
+    def invalidate(self, id_: Any) -> None:
+        self.invalidate_many([id_])
+
+    def get_stats(self) -> Dict:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["hit_ratio"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        stats["local_size"] = len(self.local)
+        stats["local_max_size"] = self.local.max_size
+        return stats
+
+
+def redis_client() -> Optional[redis.Redis]:
+    """Client for settings.REDIS_URL, or None when it isn't set (local tier only)"""
+    url = getattr(settings, "REDIS_URL", None)
+    if not url:
+        return None
+    # short timeouts: the cache must never be slower than the db it sits in front of
+    return redis.Redis.from_url(url, socket_connect_timeout=0.2, socket_timeout=0.2)
@@ -36,6 +36,28 @@ ALLOWED_HOSTS = []
 
 REDIS_URL="redis://redis:6379/0"
 
+# two-tier Item read-through cache (myapp/cache.py)
+ITEM_CACHE_LOCAL_SIZE = 10000  # rows kept in each process
+ITEM_CACHE_LOCAL_TTL = 5  # seconds, bounds how stale another process's copy can be
+ITEM_CACHE_SHARED_TTL = 300  # seconds, in Redis
+
+# task progress events on Redis Streams (my_sse_app/events.py)
+TASK_EVENTS_MAX_LENGTH = 256  # events kept per task for Last-Event-ID replay
+TASK_EVENTS_TTL = 3600  # seconds after a task's last event
+TASK_WORKERS = 4  # threads per process running started tasks (my_sse_app/workers.py)
+TASK_SUBTASK_WORKERS = 8  # threads per process running the subtasks of those tasks (my_sse_app/dag.py)
+TASK_PROGRESS_FLUSH_MS = 1000  # SubTask progress ticks are written at most this often (my_sse_app/progress.py)
+TASK_SNAPSHOT_LOCAL_TTL = 1  # seconds another process may serve a stale GET /tasks/{id} (my_sse_app/snapshots.py)
+TASK_SNAPSHOT_SHARED_TTL = 60  # seconds, in Redis
+
+# SSE responses (my_sse_app/streaming.py)
+SSE_COMPRESSION = True  # gzip/deflate the stream when the client's Accept-Encoding allows it
+SSE_COMPRESSION_LEVEL = 6  # zlib level, 1 (fastest) - 9 (smallest)
+
+# WebSocket chat sessions (my_sse_app/websocket.py)
+WS_SEND_BUFFER = 32  # events sent ahead of the client's last ack, unless it asks for ?buffer=
+WS_MAX_SEND_BUFFER = 256
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -1,8 +1,10 @@
 from ninja import Router
-from typing import List, Generator
-from django.http import StreamingHttpResponse
+from typing import List, AsyncGenerator, Optional
+from django.http import JsonResponse
+from my_sse_app.streaming import sse_response
+from my_sse_app.sse import encode
+from my_sse_app.filters import EventFilter, InvalidFilter, compile_filter
 from datetime import datetime
-import time
 import asyncio
 from my_sse_app.schema.ChatbotEvent import ChatbotEventData
 
@@ -27,46 +29,49 @@ def create_task_event(task_index: int, event_type: str) -> ChatbotEventData:
         type=event_type
     )
 
-def simulate_chat_session() -> Generator[ChatbotEventData, None, None]:
+# ! async generators + asyncio.sleep: under ASGI an open SSE connection is a suspended
+# ! coroutine between events, instead of a WSGI worker thread stuck in time.sleep
+async def simulate_chat_session() -> AsyncGenerator[ChatbotEventData, None]:
     """Simulate a complete chat session with multiple tasks"""
     # Start chat
     yield create_chat_event("chat_start")
-    time.sleep(2)  # Initial delay
+    await asyncio.sleep(2)  # Initial delay
 
     # Simulate 3 tasks
     for task_index in range(1, 4):
         # Task start
         yield create_task_event(task_index, "task_start")
-        time.sleep(3)  # Simulate task processing
+        await asyncio.sleep(3)  # Simulate task processing
 
         # Task completion
         yield create_task_event(task_index, "task_completed")
-        time.sleep(2)  # Delay between tasks
+        await asyncio.sleep(2)  # Delay between tasks
 
     # End chat
     yield create_chat_event("chat_completed")
 
-def event_stream() -> Generator[str, None, None]:
+async def event_stream(accept: Optional[EventFilter] = None) -> AsyncGenerator[str, None]:
     """Generate SSE events for a chat session"""
-    for event in simulate_chat_session():
-        yield f"data: {event.json()}\n\n"
+    async for event in simulate_chat_session():
+        # ! filtered before encoding: a dropped event costs one predicate call
+        if accept is None or accept(event):
+            yield encode(event)
 
 @router.get("/chat-session")
-def sse_chat_session(request):
+async def sse_chat_session(request, types: Optional[str] = None, tasks: Optional[str] = None):
     """
     Stream a simulated chat session with multiple tasks
     The session follows this sequence:
     1. Chat start
     2. Multiple tasks (start -> complete)
     3. Chat complete
+    `types` (e.g. task_start,task_completed) and `tasks` (task names) keep only those events
     """
-    response = StreamingHttpResponse(
-        event_stream(),
-        content_type='text/event-stream'
-    )
-    response['Cache-Control'] = 'no-cache'
-    response['X-Accel-Buffering'] = 'no'
-    return response
+    try:
+        accept = compile_filter(types, tasks)
+    except InvalidFilter as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    return sse_response(request, event_stream(accept))
 
 # Test endpoint for single events
 @router.get("/test-event/{event_type}")
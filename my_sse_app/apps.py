@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MySseAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'my_sse_app'
+
+    def ready(self):
+        # connect the task snapshot invalidation signal handlers
+        from my_sse_app import signals  # noqa: F401
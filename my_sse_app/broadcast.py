@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from typing import AsyncGenerator, Callable, Dict, Iterable, List, Optional
+
+from my_sse_app.sse import pack
+
+# In-process broadcast hub for SSE -----------------------------------------------------
+# ! one producer per process instead of one loop per client: the producer builds (and
+# ! encodes) each message once and fans it out, so the per-tick cost of N clients is N
+# ! deque appends, not N random values + N JSON encodes + N timers
+#
+# Every subscriber reads from its own bounded queue. A slow client never blocks the
+# producer: when its queue is full the oldest message is dropped (the client is
+# coalesced onto the newest values) and counted in `dropped`.
+#
+# Subscribers may live on different event loops (uvicorn's loop, or the private loop
+# `streaming.iterate_blocking` runs per WSGI stream), so the producer is a plain thread
+# and wakes subscribers with `call_soon_threadsafe` - once per loop and tick, not once
+# per subscriber, since every call writes to the loop's self-pipe.
+
+DEFAULT_QUEUE_SIZE = 16
+
+
+class Subscription:
+    """One client's view of the hub: a bounded queue + a wake-up event on the client's loop"""
+
+    def __init__(self, queue_size: int):
+        self.queue = deque(maxlen=queue_size)
+        self.dropped = 0
+        self.loop = asyncio.get_running_loop()
+        self.ready = asyncio.Event()
+
+    def push(self, message: str):
+        """Called from the producer thread, never blocks. The hub wakes the client afterwards"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+
+    async def get(self) -> Optional[str]:
+        """The next message, or None once the topic is closed"""
+        while not self.queue:
+            self.ready.clear()
+            if self.queue:
+                break
+            await self.ready.wait()
+        return self.queue.popleft()
+
+    async def drain(self) -> List[Optional[str]]:
+        """Everything queued, waiting for at least one message"""
+        messages = [await self.get()]
+        while self.queue:
+            messages.append(self.queue.popleft())
+        return messages
+
+
+def wake(subscriptions: List[Subscription]):
+    for subscription in subscriptions:
+        subscription.ready.set()
+
+
+class Topic:
+    """Subscribers of one stream of messages; `publish` and `close` may be called from any thread"""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._dropped = 0
+
+    def subscribe(self, backlog: Iterable[str] = ()) -> Subscription:
+        """Must be called on the subscriber's event loop. `backlog` is queued ahead of live messages"""
+        subscription = Subscription(self.queue_size)
+        for message in backlog:
+            subscription.push(message)
+        if subscription.queue:
+            subscription.ready.set()
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            self._dropped += subscription.dropped
+
+    def publish(self, message: Optional[str]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            subscription.push(message)
+            by_loop[subscription.loop].append(subscription)
+        for loop, waiting in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(wake, waiting)
+            except RuntimeError:
+                # the loop is gone (a WSGI stream torn down without cleanup)
+                for subscription in waiting:
+                    self.unsubscribe(subscription)
+
+    def close(self):
+        """End every subscriber's stream after the messages already queued"""
+        self.publish(None)
+
+    async def stream(self, backlog: Iterable[str] = ()) -> AsyncGenerator[str, None]:
+        """Async generator of messages for one client, for `streaming.sse_response`"""
+        subscription = self.subscribe(backlog)
+        try:
+            while True:
+                # ! a client that fell behind gets everything it missed as one chunk
+                messages = await subscription.drain()
+                if None in messages:
+                    closed_at = messages.index(None)
+                    if closed_at:
+                        yield pack(messages[:closed_at])
+                    return
+                yield pack(messages)
+        finally:
+            self.unsubscribe(subscription)
+
+    def __len__(self) -> int:
+        """Number of subscribers"""
+        return len(self._subscribers)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "dropped": self._dropped + sum(subscription.dropped for subscription in self._subscribers),
+                "queue_size": self.queue_size,
+            }
+
+
+class BroadcastHub(Topic):
+    """
+    Calls `produce()` every `interval` seconds while at least one client is subscribed,
+    and sends the result to all of them
+    """
+
+    def __init__(self, produce: Callable[[], str], interval: float, queue_size: int = DEFAULT_QUEUE_SIZE):
+        super().__init__(queue_size)
+        self.produce = produce
+        self.interval = interval
+        self._producer: Optional[threading.Thread] = None
+        self._last: Optional[str] = None
+        self._ticks = 0
+
+    def subscribe(self, backlog: Iterable[str] = ()) -> Subscription:
+        with self._lock:
+            # ! a new client gets the current value right away instead of waiting a tick
+            last = [self._last] if self._last is not None else []
+        subscription = super().subscribe([*backlog, *last])
+        with self._lock:
+            if self._producer is None:
+                self._producer = threading.Thread(target=self._run, name="broadcast-hub", daemon=True)
+                self._producer.start()
+        return subscription
+
+    def publish(self, message: str):
+        with self._lock:
+            self._last = message
+            self._ticks += 1
+        super().publish(message)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    # last client left: stop ticking until someone subscribes again
+                    self._producer = None
+                    self._last = None
+                    return
+            self.publish(self.produce())
+            time.sleep(self.interval)
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        with self._lock:
+            stats.update(ticks=self._ticks, interval=self.interval)
+        return stats
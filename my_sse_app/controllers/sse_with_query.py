@@ -1,8 +1,10 @@
 from ninja import Router
-from typing import List, Generator
-from django.http import StreamingHttpResponse
+from typing import List, AsyncGenerator, Optional
+from django.http import JsonResponse
+from my_sse_app.streaming import sse_response
+from my_sse_app.topics import TopicRegistry
+from my_sse_app.filters import InvalidFilter, compile_filter
 from datetime import datetime
-import time
 import asyncio
 from my_sse_app.schema.ChatbotEvent import ChatbotEventData
 
@@ -35,43 +37,48 @@ def create_task_event(task_index: int, event_type: str, user_id: int, project_id
         projectId=project_id
     )
 
-def simulate_chat_session(user_id: int, project_id: int) -> Generator[ChatbotEventData, None, None]:
+# ! async generators + asyncio.sleep, see my_sse_app/api.py
+async def simulate_chat_session(user_id: int, project_id: int) -> AsyncGenerator[ChatbotEventData, None]:
     """Simulate a complete chat session with multiple tasks for specific user and project"""
     # Start chat
     yield create_chat_event("chat_start", user_id, project_id)
-    time.sleep(2)  # Initial delay
+    await asyncio.sleep(2)  # Initial delay
 
     # Simulate 3 tasks
     for task_index in range(1, 4):
         # Task start
         yield create_task_event(task_index, "task_start", user_id, project_id)
-        time.sleep(3)  # Simulate task processing
+        await asyncio.sleep(3)  # Simulate task processing
         
         # Task completion
         yield create_task_event(task_index, "task_completed", user_id, project_id)
-        time.sleep(2)  # Delay between tasks
+        await asyncio.sleep(2)  # Delay between tasks
 
     # End chat
     yield create_chat_event("chat_completed", user_id, project_id)
 
-def event_stream(user_id: int, project_id: int) -> Generator[str, None, None]:
-    """Generate SSE events for a chat session with user and project context"""
-    for event in simulate_chat_session(user_id, project_id):
-        yield f"data: {event.json()}\n\n"
+# ! one simulated session per (user_id, project_id), shared by every connection on it
+chat_topics = TopicRegistry(lambda key: simulate_chat_session(*key))
 
 @router.get("/users/{user_id}/projects/{project_id}/chat-session")
-def sse_chat_session(request, user_id: int, project_id: int):
+async def sse_chat_session(request, user_id: int, project_id: int,
+                           types: Optional[str] = None, tasks: Optional[str] = None):
     """
-    Stream a simulated chat session with multiple tasks for a specific user and project
+    Stream the simulated chat session of a user's project. Every connection to the same
+    project shares one session (see my_sse_app/topics.py); joining mid-session starts at its current event
     The session follows this sequence:
     1. Chat start
     2. Multiple tasks (start -> complete)
     3. Chat complete
+    `types` and `tasks` filter the events, see my_sse_app/filters.py
     """
-    response = StreamingHttpResponse(
-        event_stream(user_id, project_id),
-        content_type='text/event-stream'
-    )
-    response['Cache-Control'] = 'no-cache'
-    response['X-Accel-Buffering'] = 'no'
-    return response
\ No newline at end of file
+    try:
+        accept = compile_filter(types, tasks)
+    except InvalidFilter as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    return sse_response(request, chat_topics.stream((user_id, project_id), accept))
+
+# Topic registry stats - open project channels and their connections
+@router.get("/topics/stats")
+def topic_stats(request):
+    return JsonResponse(chat_topics.get_stats())
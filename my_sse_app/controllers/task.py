@@ -1,22 +1,47 @@
 # tasks/api.py
 from ninja import Router
-from typing import Generator
-import asyncio
+from typing import AsyncGenerator, Generator, Optional
 import time
 import uuid
-from django.http import StreamingHttpResponse
-from my_sse_app.schema.task import TaskCreate, TaskResponse, TaskEvent
+from django.db import close_old_connections, transaction
+from django.http import JsonResponse, Http404
+from my_sse_app.schema.task import TaskCreate, TaskStart, TaskResponse, TaskEvent
 from my_sse_app.models.task import Task, SubTask
-from django.shortcuts import get_object_or_404
-import json
+from my_sse_app.events import task_bus, parse_last_event_id
+from asgiref.sync import sync_to_async
+from my_sse_app.streaming import sse_response
+from my_sse_app.sse import encode
+from my_sse_app.workers import WorkerPool
+from my_sse_app.progress import progress_writer
+from my_sse_app.snapshots import task_snapshots, load_snapshot, invalidate_snapshots
+from my_sse_app.dag import InvalidGraph, run_graph
+from my_sse_app.task_templates import (
+    DEFAULT_TEMPLATE, SubTaskTemplate, TaskTemplate, UnknownTemplate, get_template,
+)
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from pydantic import ValidationError
+from django.shortcuts import get_object_or_404, aget_object_or_404
 
 router = Router()
 
+WORK_DELAY = 1  # seconds per simulated progress step
+
+# runs started tasks, TASK_WORKERS at a time
+task_pool = WorkerPool()
+# runs the subtasks of those tasks, TASK_SUBTASK_WORKERS at a time across all of them
+subtask_pool = ThreadPoolExecutor(max_workers=getattr(settings, "TASK_SUBTASK_WORKERS", 8), thread_name_prefix="subtask")
+
 
 @router.post("/tasks", response=TaskResponse)
 def create_task(request, task_data: TaskCreate):
-    """Create a new task"""
-    task = Task.objects.create(status='created')
+    """Create a new task; `template` picks the pipeline /start will create its subtasks from"""
+    template = task_data.template or DEFAULT_TEMPLATE
+    try:
+        get_template(template)
+    except UnknownTemplate as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    task = Task.objects.create(status='created', template=template)
     return {
         "task_id": task.id,
         "status": task.status,
@@ -25,28 +50,40 @@ def create_task(request, task_data: TaskCreate):
 
 @router.post("/tasks/{task_id}/start")
 def start_task(request, task_id: uuid.UUID):
-    """Start processing a specific task"""
+    """
+    Start processing a specific task.
+    Its subtasks come from the template chosen at creation, unless a TaskStart body lists
+    them, each with the names of the subtasks it depends on; independent subtasks run in parallel
+    """
     task = get_object_or_404(Task, id=task_id)
     if task.status != "created":
         return {"error": "Task is not in a startable state"}
-    
-    task.status = "pending"
-    task.save()
-    
-    # Create subtasks
-    subtasks = [
-        ("Data Validation", 0),
-        ("Data Processing", 1),
-        ("Report Generation", 2)
-    ]
-    
-    for name, order in subtasks:
-        SubTask.objects.create(
-            task=task,
-            name=name,
-            order=order
-        )
-    
+    # ! parsed by hand: a ninja body parameter would make the body mandatory for every client
+    try:
+        json_body = request.content_type == "application/json" and request.body
+        data = TaskStart.parse_raw(request.body) if json_body else TaskStart()
+    except ValidationError as e:
+        return JsonResponse({"message": str(e)}, status=422)
+
+    try:
+        if data.subtasks:
+            template = TaskTemplate("custom", [
+                SubTaskTemplate(spec.name, spec.weight, spec.depends_on) for spec in data.subtasks
+            ])
+        else:
+            template = get_template(task.template)
+    except (InvalidGraph, ValueError, UnknownTemplate) as e:
+        return JsonResponse({"message": str(e)}, status=400)
+
+    # claim the task and create its subtasks in one transaction
+    with transaction.atomic():
+        if not Task.objects.filter(id=task.id, status='created').update(status='pending'):
+            return {"error": "Task is not in a startable state"}
+        template.instantiate(task)
+        invalidate_snapshots([task.id])
+
+    # ! the run happens on the worker pool, /progress only subscribes to its events
+    transaction.on_commit(lambda: task_pool.submit(run_task, task.id))
     return {"status": "started"}
 
 def create_event(task_id: uuid.UUID, subtask_name: str, status: str, progress: int = None, message: str = None) -> dict:
@@ -63,10 +100,10 @@ def create_event(task_id: uuid.UUID, subtask_name: str, status: str, progress: i
 def process_subtask(task_id: uuid.UUID, subtask_name: str) -> Generator[dict, None, None]:
     """Process a single subtask with progress updates"""
     try:
-        # Update subtask status in database
+        # Update subtask status in database (coalesced, see my_sse_app/progress.py)
         subtask = SubTask.objects.get(task_id=task_id, name=subtask_name)
         subtask.status = 'processing'
-        subtask.save()
+        progress_writer.record(subtask)
 
         # Initial progress event
         yield create_event(
@@ -79,10 +116,10 @@ def process_subtask(task_id: uuid.UUID, subtask_name: str) -> Generator[dict, No
         
         # Simulate work with progress updates
         for progress in range(20, 100, 20):
-            time.sleep(1)  # Simulate work
+            time.sleep(WORK_DELAY)  # Simulate work
             subtask.progress = progress
             subtask.message = f"{subtask_name} in progress: {progress}%"
-            subtask.save()
+            progress_writer.record(subtask)
             
             yield create_event(
                 task_id=task_id,
@@ -96,7 +133,7 @@ def process_subtask(task_id: uuid.UUID, subtask_name: str) -> Generator[dict, No
         subtask.status = 'completed'
         subtask.progress = 100
         subtask.message = f"{subtask_name} completed"
-        subtask.save()
+        progress_writer.record(subtask)
         
         yield create_event(
             task_id=task_id,
@@ -109,7 +146,7 @@ def process_subtask(task_id: uuid.UUID, subtask_name: str) -> Generator[dict, No
     except Exception as e:
         subtask.status = 'failed'
         subtask.message = str(e)
-        subtask.save()
+        progress_writer.record(subtask)
         
         yield create_event(
             task_id=task_id,
@@ -118,37 +155,94 @@ def process_subtask(task_id: uuid.UUID, subtask_name: str) -> Generator[dict, No
             message=str(e)
         )
 
+def run_subtask(task_id: uuid.UUID, subtask_name: str) -> bool:
+    """Run one subtask on the subtask pool, publishing its events as they happen"""
+    try:
+        status = None
+        for event in process_subtask(task_id, subtask_name):
+            # ! parallel subtasks publish straight to the task's stream: XADD orders them by emission
+            task_bus.publish(task_id, event)
+            status = event["status"]
+        return status == "completed"
+    finally:
+        close_old_connections()
+
+def skip_subtask(task_id: uuid.UUID, subtask: SubTask, reason: str):
+    subtask.status = 'failed'
+    subtask.message = f"Skipped: {reason}"
+    progress_writer.record(subtask)
+    task_bus.publish(task_id, create_event(task_id, subtask.name, "failed", message=subtask.message))
+
 # !simulator
-def task_progress_stream(task_id: uuid.UUID) -> Generator[str, None, None]:
-    """Stream task progress events"""
-    task = get_object_or_404(Task, id=task_id)
-    task.status = 'processing'
-    task.save()
-    
+def run_task(task_id: uuid.UUID):
+    """Run a started task on a pool worker, publishing its events to the task bus"""
+    # only one run per task, even if it was queued twice
+    if not Task.objects.filter(id=task_id, status='pending').update(status='processing'):
+        return
+    invalidate_snapshots([task_id])
     try:
-        # Process each subtask
-        subtasks = SubTask.objects.filter(task=task).order_by('order')
-        
-        for subtask in subtasks:
-            for event in process_subtask(task_id, subtask.name):
-                yield f"data: {json.dumps(event)}\n\n"
-        
-        # Update task status to completed
-        task.status = 'completed'
-        task.save()
-        
-    except Exception as e:
-        task.status = 'failed'
-        task.save()
-        yield f"data: {json.dumps(create_event(task_id, 'Error', 'failed', message=str(e)))}\n\n"
+        task = Task.objects.get(id=task_id)
+
+        try:
+            # Process the subtasks, each as soon as its dependencies completed
+            subtasks = {
+                subtask.name: subtask
+                for subtask in SubTask.objects.filter(task=task).order_by('order').prefetch_related('depends_on')
+            }
+            failed = run_graph(
+                list(subtasks),
+                {name: {dependency.name for dependency in subtask.depends_on.all()} for name, subtask in subtasks.items()},
+                run=lambda name: run_subtask(task_id, name),
+                skip=lambda name, reason: skip_subtask(task_id, subtasks[name], reason),
+                executor=subtask_pool,
+            )
+
+            # Update task status
+            task.status = 'failed' if failed else 'completed'
+            task.save()
+
+        except Exception as e:
+            task.status = 'failed'
+            task.save()
+            task_bus.publish(task_id, create_event(task_id, 'Error', 'failed', message=str(e)))
+    finally:
+        task_bus.finish(task_id)
+        close_old_connections()
+
+@router.get("/tasks/{task_id}")
+def task_snapshot(request, task_id: uuid.UUID):
+    """
+    The task, its subtasks and its overall (weighted) progress, without opening a stream.
+    ! served from the snapshot cache; a miss is one query for the task + one for its subtasks
+    """
+    snapshot = task_snapshots.get_or_load(task_id, load_snapshot)
+    if snapshot is None:
+        raise Http404("No Task matches the given query.")
+    return JsonResponse(snapshot)
+
+async def finished_stream(task: Task) -> AsyncGenerator[str, None]:
+    yield encode(create_event(task.id, 'Task', task.status, message=f'Task {task.status}'))
 
 @router.get("/tasks/{task_id}/progress")
-def task_progress(request, task_id: uuid.UUID):
-    """Stream task progress events"""
-    response = StreamingHttpResponse(
-        task_progress_stream(task_id),
-        content_type="text/event-stream"
-    )
-    response["Cache-Control"] = "no-cache"
-    response["X-Accel-Buffering"] = "no"
-    return response
\ No newline at end of file
+async def task_progress(request, task_id: uuid.UUID, last_event_id: Optional[str] = None):
+    """
+    Stream task progress events.
+    ! a pure subscriber: the run was queued by /start. Any number of viewers, on any worker,
+    ! or a browser reconnecting with `Last-Event-ID`, tail the same run
+    """
+    task = await aget_object_or_404(Task, id=task_id)
+    if task.status in ('completed', 'failed') and not await sync_to_async(task_bus.exists)(task_id):
+        # finished and its events expired: report, don't re-run
+        return sse_response(request, finished_stream(task))
+    last_event_id = parse_last_event_id(request.headers.get('Last-Event-ID') or last_event_id)
+    return sse_response(request, task_bus.stream(task_id, last_event_id))
+
+# Worker pool stats - queue depth and utilisation, for sizing TASK_WORKERS,
+# how many SubTask rows the coalesced progress writes actually hit, and the snapshot cache hit ratio
+@router.get("/workers/stats")
+def worker_stats(request):
+    return JsonResponse({
+        **task_pool.get_stats(),
+        "progress_writes": progress_writer.get_stats(),
+        "snapshot_cache": task_snapshots.get_stats(),
+    })
@@ -0,0 +1,71 @@
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Hashable, Iterable, List, Set
+
+# Subtask dependency graph -------------------------------------------------------------
+# ! subtasks declare what they depend on; every subtask whose dependencies are done runs
+# ! right away on a bounded executor, so a task takes as long as its critical path instead
+# ! of the sum of all its subtasks
+
+
+class InvalidGraph(ValueError):
+    pass
+
+
+def check_graph(deps: Dict[Hashable, Iterable[Hashable]]) -> List[Hashable]:
+    """Nodes in a valid run order; raises InvalidGraph for unknown nodes or cycles"""
+    deps = {node: set(requires) for node, requires in deps.items()}
+    for node, requires in deps.items():
+        unknown = requires - deps.keys()
+        if unknown:
+            raise InvalidGraph(f"{node} depends on unknown {', '.join(map(str, sorted(unknown)))}")
+    order, ready = [], [node for node, requires in deps.items() if not requires]
+    remaining = {node: set(requires) for node, requires in deps.items() if requires}
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for other, requires in list(remaining.items()):
+            requires.discard(node)
+            if not requires:
+                del remaining[other]
+                ready.append(other)
+    if remaining:
+        raise InvalidGraph(f"dependency cycle between {', '.join(map(str, sorted(remaining)))}")
+    return order
+
+
+def run_graph(nodes: List[Hashable], deps: Dict[Hashable, Set[Hashable]], run: Callable[[Hashable], bool],
+              skip: Callable[[Hashable, str], None], executor: Executor) -> Set[Hashable]:
+    """
+    `run(node)` every node once its dependencies succeeded, concurrently on `executor`.
+    A node whose dependency failed is never run, `skip(node, reason)` is called instead.
+    Returns the nodes that failed or were skipped
+    """
+    waiting = list(nodes)
+    done, failed = set(), set()
+    running = {}
+    while waiting or running:
+        changed = True
+        while changed:
+            changed = False
+            for node in list(waiting):
+                blocked_by = deps[node] & failed
+                if blocked_by:
+                    waiting.remove(node)
+                    failed.add(node)
+                    skip(node, f"{', '.join(map(str, sorted(blocked_by)))} failed")
+                    changed = True
+                elif deps[node] <= done:
+                    waiting.remove(node)
+                    running[executor.submit(run, node)] = node
+        if not running:
+            # nothing can make progress any more: what's left waits on itself
+            for node in waiting:
+                failed.add(node)
+                skip(node, "dependency cycle")
+            break
+        finished, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            node = running.pop(future)
+            succeeded = future.exception() is None and future.result()
+            (done if succeeded else failed).add(node)
+    return failed
@@ -0,0 +1,109 @@
+import re
+from typing import AsyncGenerator, Callable, Dict, Optional
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+from my_sse_app.sse import encode, encode_json, pack
+
+# Task event bus on Redis Streams ------------------------------------------------------
+# ! a task runs once, on whichever worker claimed it, and XADDs its events to the Redis
+# ! Stream `sse:task:<id>:events`; any worker serves /progress by tailing that stream with
+# ! a blocking XREAD. The stream entry id is the SSE `id:`, so a reconnecting EventSource
+# ! (which sends `Last-Event-ID` by itself) just resumes XREAD from it: missed events are
+# ! replayed from the stream, then it follows the live ones - the task is never re-run.
+#
+# The stream is capped (XADD MAXLEN ~) so it is also the replay buffer, and expires
+# TTL seconds after the last write. A finished run ends with an `end` entry that tells
+# every reader to close.
+
+STREAM_MAX_LENGTH = getattr(settings, "TASK_EVENTS_MAX_LENGTH", 256)  # entries kept for replay
+STREAM_TTL = getattr(settings, "TASK_EVENTS_TTL", 3600)  # seconds after the last event
+BLOCK_MS = 15000  # one XREAD waits this long, then a keepalive comment is sent
+READ_COUNT = 100
+
+STREAM_ID = re.compile(r"^\d+-\d+$")
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[str]:
+    """`Last-Event-ID` as sent by the browser; anything that isn't a stream id means "from the start" """
+    if value and STREAM_ID.match(value):
+        return value
+    return None
+
+
+class TaskEventBus:
+    """
+    Publish task events from the sync worker that runs the task, tail them from async views.
+    Every tail opens its own async connection: a blocking XREAD holds its connection, and
+    under WSGI each stream runs on its own event loop (see streaming.iterate_blocking)
+    """
+
+    def __init__(self, client: redis.Redis, aconnect: Callable[[], redis.asyncio.Redis],
+                 max_length: int = STREAM_MAX_LENGTH, ttl: int = STREAM_TTL, block_ms: int = BLOCK_MS):
+        self.client = client
+        self.aconnect = aconnect
+        self.max_length = max_length
+        self.ttl = ttl
+        self.block_ms = block_ms
+
+    @staticmethod
+    def key(task_id) -> str:
+        return f"sse:task:{task_id}:events"
+
+    def _add(self, task_id, fields: Dict[str, str]) -> str:
+        key = self.key(task_id)
+        pipe = self.client.pipeline()
+        pipe.xadd(key, fields, maxlen=self.max_length, approximate=True)
+        pipe.expire(key, self.ttl)
+        event_id, _ = pipe.execute()
+        return event_id
+
+    def publish(self, task_id, event: Dict) -> str:
+        """Append one event, returns its id"""
+        return self._add(task_id, {"data": encode_json(event)})
+
+    def finish(self, task_id):
+        """Close every reader of the task's stream, now and later"""
+        self._add(task_id, {"end": "1"})
+
+    def exists(self, task_id) -> bool:
+        return bool(self.client.exists(self.key(task_id)))
+
+    async def stream(self, task_id, last_event_id: Optional[str] = None) -> AsyncGenerator[str, None]:
+        """SSE frames of the events after `last_event_id`, until the run's `end` entry"""
+        key = self.key(task_id)
+        last_id = last_event_id or "0-0"
+        client = self.aconnect()
+        try:
+            while True:
+                reply = await client.xread({key: last_id}, block=self.block_ms, count=READ_COUNT)
+                if not reply:
+                    # ! nothing for a while: a comment line keeps proxies from closing the connection
+                    yield ": keepalive\n\n"
+                    continue
+                # ! every entry this XREAD returned goes out as one chunk
+                frames = []
+                for entry_id, fields in reply[0][1]:
+                    last_id = entry_id
+                    if "end" in fields:
+                        if frames:
+                            yield pack(frames)
+                        return
+                    frames.append(encode(fields["data"], id=entry_id))
+                yield pack(frames)
+        finally:
+            await client.aclose()
+
+
+def _connect(url: str = settings.REDIS_URL) -> redis.Redis:
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+def _aconnect(url: str = settings.REDIS_URL) -> redis.asyncio.Redis:
+    # no socket timeout: reads block for up to BLOCK_MS on purpose
+    return redis.asyncio.Redis.from_url(url, decode_responses=True)
+
+
+task_bus = TaskEventBus(client=_connect(), aconnect=_aconnect)
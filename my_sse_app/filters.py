@@ -0,0 +1,46 @@
+from typing import Callable, FrozenSet, Optional, get_args
+
+from my_sse_app.schema.ChatbotEvent import ChatbotEventData
+
+# Server-side event filters ------------------------------------------------------------
+# ! a subscriber says at connect time which events it wants (`?types=task_start,task_completed`,
+# ! `?tasks=analysis`). The query is compiled once into a predicate that runs on the event
+# ! *before* it is encoded, so an unwanted event is never serialized nor written to the socket.
+# The task filter only applies to events that have a task: chat lifecycle events pass it.
+
+EVENT_TYPES = frozenset(get_args(ChatbotEventData.model_fields["type"].annotation))
+
+EventFilter = Callable[[ChatbotEventData], bool]
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+def parse_list(value: Optional[str]) -> FrozenSet[str]:
+    """`a,b, c` -> {"a", "b", "c"}; None or empty -> empty set (no filtering)"""
+    if not value:
+        return frozenset()
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+
+def compile_filter(types: Optional[str] = None, tasks: Optional[str] = None) -> Optional[EventFilter]:
+    """
+    Predicate for the `types` / `tasks` query params, or None when nothing is filtered out
+    (the stream then skips the call altogether). Raises InvalidFilter for unknown types
+    """
+    types, tasks = parse_list(types), parse_list(tasks)
+    unknown = types - EVENT_TYPES
+    if unknown:
+        raise InvalidFilter(f"Unknown event types: {', '.join(sorted(unknown))}")
+    if types == EVENT_TYPES:
+        types = frozenset()
+
+    # ! one closure per combination: the per-event cost is a set lookup or two, no branching on the query
+    if types and tasks:
+        return lambda event: event.type in types and (event.taskName is None or event.taskName in tasks)
+    if types:
+        return lambda event: event.type in types
+    if tasks:
+        return lambda event: event.taskName is None or event.taskName in tasks
+    return None
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_sse_app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subtask',
+            name='depends_on',
+            field=models.ManyToManyField(blank=True, related_name='dependents', to='my_sse_app.subtask'),
+        ),
+    ]
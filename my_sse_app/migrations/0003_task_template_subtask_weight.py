@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('my_sse_app', '0002_subtask_depends_on'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subtask',
+            name='weight',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='template',
+            field=models.CharField(default='default', max_length=100),
+        ),
+    ]
@@ -0,0 +1 @@
+from my_sse_app.models.task import Task, SubTask
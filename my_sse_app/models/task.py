@@ -12,6 +12,8 @@ class Task(models.Model):
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='created')
+    # pipeline its subtasks are created from on /start (see my_sse_app/task_templates.py)
+    template = models.CharField(max_length=100, default='default')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -25,6 +27,10 @@ class SubTask(models.Model):
     status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES, default='pending')
     progress = models.IntegerField(default=0)
     message = models.TextField(null=True, blank=True)
+    # share of the task's overall progress
+    weight = models.PositiveIntegerField(default=1)
+    # subtasks of the same task that must complete before this one starts (see my_sse_app/dag.py)
+    depends_on = models.ManyToManyField('self', symmetrical=False, related_name='dependents', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
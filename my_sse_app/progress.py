@@ -0,0 +1,83 @@
+import threading
+import time
+import uuid
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from my_sse_app.models import SubTask
+from my_sse_app.snapshots import invalidate_snapshots
+
+# Coalesced SubTask progress writes ----------------------------------------------------
+# ! a progress tick used to be a full `subtask.save()` (every column, one UPDATE per tick
+# ! per subtask). The writer keeps only the latest state of each subtask and writes the
+# ! pending ones together - one `bulk_update` of the changed columns, across every task
+# ! running in this process - at most every FLUSH_INTERVAL.
+# Status transitions (processing, completed, failed) are flushed right away, so final
+# states are as durable as before; only intermediate progress can lag, by < FLUSH_INTERVAL.
+# Each flush drops the cached snapshots of the tasks it touched (my_sse_app/snapshots.py).
+
+FLUSH_INTERVAL = getattr(settings, "TASK_PROGRESS_FLUSH_MS", 1000) / 1000  # seconds
+PROGRESS_FIELDS = ["status", "progress", "message", "updated_at"]
+FINAL_STATUSES = ('completed', 'failed')
+
+
+class ProgressWriter:
+    """Thread-safe: every pool worker records into the same writer"""
+
+    def __init__(self, interval: float = FLUSH_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[int, Tuple[uuid.UUID, str, int, str]] = {}
+        self._statuses: Dict[int, str] = {}  # last status seen per running subtask
+        self._lock = threading.Lock()
+        # ! flushes run one at a time, so an older batch can never land after a newer one
+        self._flush_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._recorded = 0
+        self._flushes = 0
+        self._rows = 0
+
+    def record(self, subtask: SubTask):
+        """Queue the current status / progress / message of `subtask`, flushing if it's time to"""
+        with self._lock:
+            self._recorded += 1
+            self._pending[subtask.pk] = (subtask.task_id, subtask.status, subtask.progress, subtask.message)
+            transition = self._statuses.get(subtask.pk) != subtask.status
+            if subtask.status in FINAL_STATUSES:
+                self._statuses.pop(subtask.pk, None)
+            else:
+                self._statuses[subtask.pk] = subtask.status
+            due = transition or time.monotonic() - self._last_flush >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            if not batch:
+                return
+            now = timezone.now()  # bulk_update skips auto_now
+            SubTask.objects.bulk_update([
+                SubTask(pk=pk, status=status, progress=progress, message=message, updated_at=now)
+                for pk, (_, status, progress, message) in batch.items()
+            ], PROGRESS_FIELDS)
+            invalidate_snapshots({task_id for task_id, *_ in batch.values()})
+            with self._lock:
+                self._flushes += 1
+                self._rows += len(batch)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "recorded": self._recorded,
+                "flushes": self._flushes,
+                "rows_written": self._rows,
+                "pending": len(self._pending),
+                "interval_ms": self.interval * 1000,
+            }
+
+
+progress_writer = ProgressWriter()
@@ -2,10 +2,19 @@
 from ninja import Schema
 from datetime import datetime
 from uuid import UUID
-from typing import Optional
+from typing import List, Optional
 
 class TaskCreate(Schema):
     name: Optional[str] = None
+    template: Optional[str] = None  # a registered task template, "default" if not given
+
+class SubTaskSpec(Schema):
+    name: str
+    weight: int = 1
+    depends_on: List[str] = []
+
+class TaskStart(Schema):
+    subtasks: Optional[List[SubTaskSpec]] = None
 
 class TaskResponse(Schema):
     task_id: UUID
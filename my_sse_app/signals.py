@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from my_sse_app.models import Task, SubTask
+from my_sse_app.snapshots import invalidate_snapshots
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_snapshot(sender, instance, **kwargs):
+    """Writes made through the model; bulk writes and .update() invalidate where they happen"""
+    invalidate_snapshots([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=SubTask)
+def invalidate_subtask_task_snapshot(sender, instance, **kwargs):
+    invalidate_snapshots([instance.task_id])
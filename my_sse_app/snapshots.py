@@ -0,0 +1,64 @@
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from config.cache import ReadThroughCache, redis_client
+from my_sse_app.models import Task
+
+# Cached task snapshots ----------------------------------------------------------------
+# ! GET /tasks/{id} answers "where is this task at" without a stream: the task and its
+# ! subtasks in one query + one prefetch query, cached by the two-tier read-through cache
+# ! of config/cache.py (in-process LRU, then Redis). Every persisted change drops the entry -
+# ! the progress writer's flushes, status updates, signals for plain saves - so pollers
+# ! mostly hit the cache and only pay a query right after the task actually moved.
+# Other processes' in-process copies can't be dropped from here: LOCAL_TTL bounds their lag.
+
+LOCAL_SIZE = getattr(settings, "TASK_SNAPSHOT_LOCAL_SIZE", 10000)
+LOCAL_TTL = getattr(settings, "TASK_SNAPSHOT_LOCAL_TTL", 1)  # seconds
+SHARED_TTL = getattr(settings, "TASK_SNAPSHOT_SHARED_TTL", 60)  # seconds, in Redis
+
+SUBTASK_FIELDS = ("name", "order", "status", "progress", "weight", "message")
+
+KEY = "sse:task:{}:snapshot"
+
+
+def overall_progress(status: str, subtasks: Iterable[Dict]) -> int:
+    """Progress of the whole task, each subtask counting for its weight"""
+    if status == 'completed':
+        return 100
+    subtasks = list(subtasks)
+    total = sum(subtask["weight"] for subtask in subtasks)
+    if not total:
+        return 0
+    return round(sum(subtask["weight"] * subtask["progress"] for subtask in subtasks) / total)
+
+
+def load_snapshot(task_id) -> Optional[Dict]:
+    task = Task.objects.filter(id=task_id).prefetch_related('subtasks').first()
+    if task is None:
+        return None
+    subtasks = [
+        {field: getattr(subtask, field) for field in SUBTASK_FIELDS}
+        for subtask in task.subtasks.all()  # ordered by `order` (SubTask.Meta)
+    ]
+    return {
+        "task_id": task.id,
+        "status": task.status,
+        "template": task.template,
+        "progress": overall_progress(task.status, subtasks),
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "subtasks": subtasks,
+    }
+
+
+task_snapshots = ReadThroughCache(KEY, shared=redis_client(), local_max_size=LOCAL_SIZE,
+                                  local_ttl=LOCAL_TTL, shared_ttl=SHARED_TTL)
+
+
+def invalidate_snapshots(task_ids: Iterable) -> None:
+    """Drop snapshots now and again once the surrounding write commits (as myapp.cache.invalidate_items does for Items)"""
+    task_ids = list(task_ids)
+    task_snapshots.invalidate_many(task_ids)
+    transaction.on_commit(lambda: task_snapshots.invalidate_many(task_ids))
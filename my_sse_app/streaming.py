@@ -0,0 +1,97 @@
+import asyncio
+import zlib
+from typing import AsyncGenerator, AsyncIterator, Generator, Optional, TypeVar
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+T = TypeVar("T")
+
+# streaming compression of SSE responses, negotiated per connection (see `sse_response`)
+COMPRESS = getattr(settings, "SSE_COMPRESSION", True)
+COMPRESSION_LEVEL = getattr(settings, "SSE_COMPRESSION_LEVEL", 6)
+# Content-Encoding -> zlib wbits, in order of preference
+ENCODINGS = {
+    "gzip": 16 + zlib.MAX_WBITS,  # gzip header + trailer
+    "deflate": zlib.MAX_WBITS,  # HTTP "deflate" is the zlib format
+}
+
+
+def iterate_blocking(stream: AsyncIterator[T]) -> Generator[T, None, None]:
+    """
+    Drive an async generator from a worker thread, one item at a time.
+    ! on one event loop for the whole stream: an async generator is bound to the loop that first
+    ! iterates it, and a short-lived loop per item (async_to_sync) closes it when that loop shuts down
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        # client went away (or the stream ended): let the generator run its cleanup
+        loop.run_until_complete(stream.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+def accepted_encoding(request) -> Optional[str]:
+    """gzip or deflate if the client's Accept-Encoding allows it (q > 0), gzip first"""
+    accepted = {}
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        if params.strip().startswith('q='):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                continue
+        accepted[coding.strip().lower()] = q
+    for coding in ENCODINGS:
+        if accepted.get(coding, accepted.get('*', 0)) > 0:
+            return coding
+    return None
+
+
+async def compress_stream(stream: AsyncIterator[str], encoding: str, level: int = COMPRESSION_LEVEL) -> AsyncGenerator[bytes, None]:
+    """
+    Compress SSE chunks with one zlib stream for the whole connection.
+    ! every chunk is followed by a sync flush: the client can decode each event as soon as it
+    ! arrives, while later events still compress against everything sent before them
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, ENCODINGS[encoding])
+    try:
+        async for chunk in stream:
+            yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush(zlib.Z_FINISH)
+    finally:
+        await stream.aclose()
+
+
+def sse_response(request, stream: AsyncIterator[str], compress: bool = COMPRESS) -> StreamingHttpResponse:
+    """
+    text/event-stream response over an async generator of SSE frames.
+    ! under ASGI the generator runs on the event loop and an idle client costs a suspended coroutine.
+    ! under WSGI (runserver, gunicorn) Django would drain an async iterator completely before sending
+    ! anything, which never happens for a live stream, so there it is driven one event at a time from
+    ! the worker thread instead - the thread is held for the whole stream, as before.
+    With `compress`, a client that sends `Accept-Encoding: gzip` (or deflate) gets the stream compressed
+    """
+    encoding = accepted_encoding(request) if compress else None
+    if encoding:
+        stream = compress_stream(stream, encoding)
+    content = stream if isinstance(request, ASGIRequest) else iterate_blocking(stream)
+    response = StreamingHttpResponse(
+        content,
+        content_type='text/event-stream'  # ! important
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    if compress:
+        response['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
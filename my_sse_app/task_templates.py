@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+
+from my_sse_app.dag import InvalidGraph, check_graph
+from my_sse_app.models import Task, SubTask
+
+# Task templates -----------------------------------------------------------------------
+# ! a template is a named pipeline of subtasks - weights and dependencies included - that
+# ! `TaskCreate.template` selects. /start instantiates it with one bulk INSERT for the
+# ! subtasks and one for their dependency rows, in a transaction: 50 subtasks cost two
+# ! round trips instead of 50 (+ one per `depends_on.set`).
+
+
+class UnknownTemplate(LookupError):
+    pass
+
+
+class SubTaskTemplate:
+    """One step of a pipeline; `weight` is its share of the task's overall progress"""
+
+    def __init__(self, name: str, weight: int = 1, depends_on: Iterable[str] = ()):
+        if weight < 1:
+            raise ValueError(f"{name}: weight must be at least 1")
+        self.name = name
+        self.weight = weight
+        self.depends_on = list(depends_on)
+
+
+class TaskTemplate:
+    """A named pipeline, validated once when it is built (unique names, no unknown deps, no cycles)"""
+
+    def __init__(self, name: str, subtasks: List[SubTaskTemplate]):
+        if not subtasks:
+            raise InvalidGraph(f"{name}: a template needs at least one subtask")
+        if len({subtask.name for subtask in subtasks}) != len(subtasks):
+            raise InvalidGraph("Subtask names must be unique")
+        check_graph({subtask.name: subtask.depends_on for subtask in subtasks})
+        self.name = name
+        self.subtasks = subtasks
+
+    def instantiate(self, task: Task) -> List[SubTask]:
+        """Create the task's SubTask rows and their dependencies: two INSERTs, all or nothing"""
+        with transaction.atomic():
+            created = SubTask.objects.bulk_create([
+                SubTask(task=task, name=subtask.name, order=order, weight=subtask.weight)
+                for order, subtask in enumerate(self.subtasks)
+            ])
+            if created[0].pk is None:
+                # backend can't return ids from a bulk insert (MySQL): one SELECT for them
+                created = list(SubTask.objects.filter(task=task).order_by('order'))
+            by_name = {subtask.name: subtask for subtask in created}
+            Dependency = SubTask.depends_on.through
+            Dependency.objects.bulk_create([
+                Dependency(from_subtask_id=by_name[subtask.name].pk, to_subtask_id=by_name[dependency].pk)
+                for subtask in self.subtasks
+                for dependency in subtask.depends_on
+            ])
+        return created
+
+
+TASK_TEMPLATES: Dict[str, TaskTemplate] = {}
+
+
+def register_template(template: TaskTemplate) -> TaskTemplate:
+    TASK_TEMPLATES[template.name] = template
+    return template
+
+
+def get_template(name: str) -> TaskTemplate:
+    try:
+        return TASK_TEMPLATES[name]
+    except KeyError:
+        raise UnknownTemplate(f"Unknown task template: {name}") from None
+
+
+DEFAULT_TEMPLATE = "default"
+
+register_template(TaskTemplate(DEFAULT_TEMPLATE, [
+    SubTaskTemplate("Data Validation"),
+    SubTaskTemplate("Data Processing", weight=3, depends_on=["Data Validation"]),
+    SubTaskTemplate("Report Generation", depends_on=["Data Processing"]),
+]))
+
+# two sources extracted in parallel, merged, then reported on
+register_template(TaskTemplate("etl", [
+    SubTaskTemplate("Extract Orders", weight=2),
+    SubTaskTemplate("Extract Customers", weight=2),
+    SubTaskTemplate("Transform", weight=3, depends_on=["Extract Orders", "Extract Customers"]),
+    SubTaskTemplate("Load", weight=2, depends_on=["Transform"]),
+    SubTaskTemplate("Report Generation", depends_on=["Load"]),
+]))
+
+register_template(TaskTemplate("report", [
+    SubTaskTemplate("Report Generation"),
+]))
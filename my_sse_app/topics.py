@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncGenerator, Callable, Dict, Hashable, Optional, Tuple
+
+from my_sse_app.broadcast import DEFAULT_QUEUE_SIZE, Subscription, Topic
+from my_sse_app.filters import EventFilter
+from my_sse_app.sse import encode, pack
+
+# Topic registry for keyed SSE fan-out -------------------------------------------------
+# ! one upstream source per key - e.g. (user_id, project_id) - instead of one per connection:
+# ! the first subscriber of a key starts its source, every later one just joins the topic,
+# ! and the last one to leave drops the topic and cancels the source. So an open key costs
+# ! its subscribers' bounded queues + one suspended coroutine, and a key nobody is watching
+# ! costs nothing at all. Subscribe / unsubscribe are a dict lookup and a set add / discard.
+#
+# Sources run on one event loop owned by the registry (a daemon thread), not on a client's
+# loop: a WSGI stream's private loop goes away with its client, the topic must not.
+# Each event is encoded at most once per topic, and only if some subscriber's filter
+# (my_sse_app/filters.py) wants it.
+
+
+class Message:
+    """An event published on a topic; its SSE frame is encoded on first use, then shared"""
+
+    __slots__ = ("event", "_frame")
+
+    def __init__(self, event: Any):
+        self.event = event
+        self._frame: Optional[str] = None
+
+    @property
+    def frame(self) -> str:
+        if self._frame is None:
+            self._frame = encode(self.event)
+        return self._frame
+
+
+class TopicRegistry:
+    """`source(key)` is an async generator of the events of one key, started on first subscribe"""
+
+    def __init__(self, source: Callable[[Hashable], AsyncGenerator[Any, None]], queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.source = source
+        self.queue_size = queue_size
+        self._topics: Dict[Hashable, Topic] = {}
+        self._sources: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started = 0
+        self._collected = 0
+
+    def _source_loop(self) -> asyncio.AbstractEventLoop:
+        # called with the lock held
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="topic-sources", daemon=True).start()
+        return self._loop
+
+    def subscribe(self, key: Hashable) -> Tuple[Topic, Subscription]:
+        """Must be called on the subscriber's event loop (see `broadcast.Topic.subscribe`)"""
+        with self._lock:
+            topic = self._topics.get(key)
+            if topic is not None:
+                return topic, topic.subscribe()
+            topic = self._topics[key] = Topic(self.queue_size)
+            # ! subscribed before the source starts, so the first subscriber sees its first event
+            subscription = topic.subscribe()
+            self._sources[key] = asyncio.run_coroutine_threadsafe(self._pump(key, topic), self._source_loop())
+            self._started += 1
+        return topic, subscription
+
+    def unsubscribe(self, key: Hashable, topic: Topic, subscription: Subscription):
+        with self._lock:
+            topic.unsubscribe(subscription)
+            if not len(topic):
+                self._collect(key, topic)
+
+    def _collect(self, key: Hashable, topic: Topic):
+        # called with the lock held; the topic may already have been replaced by a newer one
+        if self._topics.get(key) is topic:
+            del self._topics[key]
+            self._sources.pop(key).cancel()
+            self._collected += 1
+
+    async def _pump(self, key: Hashable, topic: Topic):
+        events = self.source(key)
+        try:
+            async for event in events:
+                topic.publish(Message(event))
+                if not len(topic):
+                    # every subscriber's loop went away without unsubscribing (see Topic.publish)
+                    return
+        finally:
+            # ! closed here, not whenever the loop's asyncgen finalizer gets to it
+            await events.aclose()
+            with self._lock:
+                if self._topics.get(key) is topic:
+                    del self._topics[key]
+                    del self._sources[key]
+                    self._collected += 1
+            # source exhausted (or cancelled): the remaining subscribers end after what's queued
+            topic.close()
+
+    async def stream(self, key: Hashable, accept: Optional[EventFilter] = None) -> AsyncGenerator[str, None]:
+        """SSE chunks of the key's events that pass `accept`, for `streaming.sse_response`"""
+        topic, subscription = self.subscribe(key)
+        try:
+            while True:
+                messages = await subscription.drain()
+                frames = [
+                    message.frame for message in messages
+                    if message is not None and (accept is None or accept(message.event))
+                ]
+                if frames:
+                    yield pack(frames)
+                if None in messages:
+                    return
+        finally:
+            self.unsubscribe(key, topic, subscription)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            topics = list(self._topics.values())
+            stats = {"topics": len(topics), "started": self._started, "collected": self._collected}
+        stats["subscribers"] = sum(len(topic) for topic in topics)
+        return stats
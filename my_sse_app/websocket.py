@@ -0,0 +1,197 @@
+import asyncio
+from typing import Any, AsyncGenerator, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+import msgpack
+from django.conf import settings
+from pydantic_core import from_json, to_json, to_jsonable_python
+
+from my_sse_app.api import simulate_chat_session
+from my_sse_app.filters import EventFilter, InvalidFilter, compile_filter
+
+# WebSocket transport for chat sessions ------------------------------------------------
+# ! the same ChatbotEventData stream as /api/sse/chat-session, over one ASGI WebSocket
+# ! (routed in config/asgi.py, no Channels needed) - so the client can talk back on the
+# ! same connection:
+#
+#   connect   ws://host/ws/chat-session?types=...&tasks=...&buffer=32
+#             subprotocol "msgpack" or "json" (or ?format=), json if none is offered
+#   server -> {"seq": 1, "event": {...}} ... {"end": true, "seq": 8}, then close 1000
+#   client -> {"ack": 5}       every event up to seq 5 was handled
+#             {"cancel": true} stop the session: {"cancelled": true, "seq": n}, close 1000
+#
+# msgpack frames are binary, json frames are text; client frames use the same format.
+# Backpressure: at most `buffer` events are sent ahead of the client's last ack. Past
+# that the session isn't pulled any further - the producer waits instead of queueing -
+# until an ack opens the window again.
+
+SEND_BUFFER = getattr(settings, "WS_SEND_BUFFER", 32)  # unacked events per connection, by default
+MAX_SEND_BUFFER = getattr(settings, "WS_MAX_SEND_BUFFER", 256)  # the most a client may ask for
+
+# close codes (RFC 6455)
+NORMAL_CLOSURE = 1000
+UNSUPPORTED_DATA = 1003
+INVALID_PAYLOAD = 1007
+POLICY_VIOLATION = 1008
+CANCELLED = "cancelled"  # the client asked to stop: close normally after telling it where the session stopped
+
+
+class JsonCodec:
+    name = "json"
+
+    def dumps(self, message: Dict) -> Dict:
+        return {"type": "websocket.send", "text": to_json(message).decode()}
+
+    def loads(self, frame: Dict) -> Any:
+        return from_json(frame.get("text") or frame.get("bytes") or b"")
+
+
+class MsgpackCodec:
+    name = "msgpack"
+
+    def dumps(self, message: Dict) -> Dict:
+        # to_jsonable_python: pydantic models (the events) -> plain dicts msgpack can pack
+        return {"type": "websocket.send", "bytes": msgpack.packb(to_jsonable_python(message))}
+
+    def loads(self, frame: Dict) -> Any:
+        if frame.get("bytes") is None:
+            raise ValueError("msgpack connections send binary frames")
+        return msgpack.unpackb(frame["bytes"])
+
+
+# in order of preference when the client offers several subprotocols
+CODECS = {codec.name: codec for codec in (MsgpackCodec(), JsonCodec())}
+
+
+class InvalidConnection(ValueError):
+    pass
+
+
+def negotiate(scope: Dict, params: Dict) -> Tuple[Any, Optional[str]]:
+    """The codec, and the subprotocol to confirm in the handshake (None if it came from ?format=)"""
+    offered = scope.get("subprotocols") or []
+    for name, codec in CODECS.items():
+        if name in offered:
+            return codec, name
+    name = params.get("format", "json")
+    if name not in CODECS:
+        raise InvalidConnection(f"Unknown format: {name}")
+    return CODECS[name], None
+
+
+def send_buffer(value: Optional[str]) -> int:
+    if value is None:
+        return SEND_BUFFER
+    try:
+        size = int(value)
+    except ValueError:
+        raise InvalidConnection(f"Invalid buffer: {value}") from None
+    if not 1 <= size <= MAX_SEND_BUFFER:
+        raise InvalidConnection(f"buffer must be between 1 and {MAX_SEND_BUFFER}")
+    return size
+
+
+class ChatSocket:
+    """One accepted connection: sends the session's events, reads acks and cancel"""
+
+    def __init__(self, receive, send, codec, events: AsyncGenerator, accept: Optional[EventFilter], window: int):
+        self.receive = receive
+        self.send = send
+        self.codec = codec
+        self.events = events
+        self.accept = accept
+        self.window = window
+        self.sent = 0
+        self.acked = 0
+        self.window_open = asyncio.Event()
+
+    async def produce(self):
+        async for event in self.events:
+            if self.accept is not None and not self.accept(event):
+                continue
+            while self.sent - self.acked >= self.window:
+                # ! backpressure: don't pull the next event until the client caught up
+                self.window_open.clear()
+                await self.window_open.wait()
+            self.sent += 1
+            await self.send(self.codec.dumps({"seq": self.sent, "event": event}))
+        await self.send(self.codec.dumps({"end": True, "seq": self.sent}))
+
+    async def listen(self) -> Optional[int]:
+        """Handle client frames; returns the close code to send, CANCELLED, or None if the client went away"""
+        while True:
+            frame = await self.receive()
+            if frame["type"] == "websocket.disconnect":
+                return None
+            try:
+                message = self.codec.loads(frame)
+            except (ValueError, TypeError):
+                return INVALID_PAYLOAD
+            if not isinstance(message, dict):
+                return UNSUPPORTED_DATA
+            ack = message.get("ack")
+            # ! a seq is an integer: no floats (1e400 decodes to inf), no bools (True is an int)
+            if ack is not None and (not isinstance(ack, int) or isinstance(ack, bool)):
+                return INVALID_PAYLOAD
+            if ack is not None:
+                # acks past what was sent don't open the window any further
+                self.acked = max(self.acked, min(ack, self.sent))
+                self.window_open.set()
+            if message.get("cancel"):
+                return CANCELLED
+
+    async def run(self):
+        producer = asyncio.ensure_future(self.produce())
+        listener = asyncio.ensure_future(self.listen())
+        try:
+            await asyncio.wait({producer, listener}, return_when=asyncio.FIRST_COMPLETED)
+            if producer.done():
+                producer.result()  # surface a failing session
+                close_code = NORMAL_CLOSURE
+            else:
+                # ! stopped before anything else is sent: one task writes to the socket at a time
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+                close_code = listener.result()
+            if close_code == CANCELLED:
+                await self.send(self.codec.dumps({"cancelled": True, "seq": self.sent}))
+                close_code = NORMAL_CLOSURE
+            if close_code is not None:
+                await self.send({"type": "websocket.close", "code": close_code})
+        finally:
+            for task in (producer, listener):
+                task.cancel()
+            await asyncio.gather(producer, listener, return_exceptions=True)
+            await self.events.aclose()
+
+
+async def chat_session(scope, receive, send):
+    """ASGI app for /ws/chat-session"""
+    if (await receive())["type"] != "websocket.connect":
+        return
+    params = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+    try:
+        codec, subprotocol = negotiate(scope, params)
+        window = send_buffer(params.get("buffer"))
+        accept = compile_filter(params.get("types"), params.get("tasks"))
+    except (InvalidConnection, InvalidFilter):
+        # closing before accepting rejects the handshake (HTTP 403)
+        await send({"type": "websocket.close", "code": POLICY_VIOLATION})
+        return
+    await send({"type": "websocket.accept", "subprotocol": subprotocol})
+    await ChatSocket(receive, send, codec, simulate_chat_session(), accept, window).run()
+
+
+ROUTES = {
+    "/ws/chat-session": chat_session,
+}
+
+
+async def websocket_application(scope, receive, send):
+    """Every WebSocket connection of config/asgi.py goes through here"""
+    handler = ROUTES.get(scope["path"])
+    if handler is None:
+        await receive()
+        await send({"type": "websocket.close", "code": POLICY_VIOLATION})
+        return
+    await handler(scope, receive, send)
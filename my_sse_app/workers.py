@@ -0,0 +1,110 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List
+
+from django.conf import settings
+
+# Local worker pool for task runs ------------------------------------------------------
+# ! a task is run by one of `size` long-lived threads, not by the request that streams it:
+# ! a client that disconnects doesn't kill the job, and a viewer never starts it again.
+# Threads rather than processes: the simulated work is sleeps and db writes (I/O bound),
+# and every thread gets its own Django db connection.
+#
+# get_stats() gives what's needed to size the pool under load: how many runs are queued,
+# how many workers are busy right now, and the share of worker time spent working.
+
+DEFAULT_WORKERS = getattr(settings, "TASK_WORKERS", 4)
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool:
+    """Fixed-size thread pool with a FIFO queue, started on first submit"""
+
+    def __init__(self, size: int = DEFAULT_WORKERS, name: str = "task-worker"):
+        self.size = size
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._started_at = None
+        self._running: Dict[int, float] = {}  # thread ident -> start of its current run
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+        self._wait_seconds = 0.0
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._started_at = time.monotonic()
+            for n in range(self.size):
+                thread = threading.Thread(target=self._work, name=f"{self.name}-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, fn: Callable, *args):
+        self._start()
+        with self._lock:
+            self._submitted += 1
+        self._queue.put((fn, args, time.monotonic()))
+
+    def _work(self):
+        while True:
+            fn, args, queued_at = self._queue.get()
+            if fn is None:
+                self._queue.task_done()
+                return
+            started_at = time.monotonic()
+            with self._lock:
+                self._wait_seconds += started_at - queued_at
+                self._running[threading.get_ident()] = started_at
+            failed = False
+            try:
+                fn(*args)
+            except Exception:
+                failed = True
+                logger.exception("%s failed", getattr(fn, "__name__", fn))
+            finally:
+                with self._lock:
+                    del self._running[threading.get_ident()]
+                    self._busy_seconds += time.monotonic() - started_at
+                    self._completed += not failed
+                    self._failed += failed
+                self._queue.task_done()
+
+    def join(self):
+        """Block until every submitted run has finished"""
+        self._queue.join()
+
+    def shutdown(self):
+        """Finish the queued runs, then stop the workers"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put((None, (), time.monotonic()))
+        for thread in threads:
+            thread.join()
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            uptime = now - self._started_at if self._started_at else 0.0
+            busy_seconds = self._busy_seconds + sum(now - started for started in self._running.values())
+            started = self._completed + self._failed + len(self._running)
+            return {
+                "workers": self.size,
+                "busy": len(self._running),
+                "queued": self._queue.qsize(),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                # share of worker time spent running tasks since the pool started
+                "utilisation": round(busy_seconds / (uptime * self.size), 4) if uptime else 0.0,
+                # time a run spent queued before a worker picked it up
+                "avg_wait_ms": round(self._wait_seconds / started * 1000, 2) if started else 0.0,
+            }
@@ -1,17 +1,26 @@
 from ninja import NinjaAPI
 from ninja import Router
-from django.http import JsonResponse
-from typing import List, Generator
+from django.http import JsonResponse, Http404
+from typing import List, Optional
 # from myapp.middlewares.logging import logging_middleware
 from myapp.models import Item
-from myapp.schema.Item import ItemSchema
-from django.shortcuts import get_object_or_404
-from django.core.serializers import serialize
-import json
-
-from django.http import StreamingHttpResponse # for SSE real-time streaming events 
+from myapp.schema.Item import ItemSchema, ItemPatchSchema, ItemIdsSchema
+from myapp.writes import create_item as insert_item, update_item_fields, delete_items
+from myapp.bulk import clamp_batch_size, bulk_create_items, bulk_update_items, bulk_delete_items
+from myapp.pagination import keyset_slice, InvalidCursor
+from myapp.serializers import (
+    ITEM_FIELDS, InvalidFields, parse_fields, with_version, project, item_to_dict, item_values, stream_json_page
+)
+from myapp.cache import item_cache
+from myapp.search import SearchUnavailable, search_items
+from myapp.transfer import FORMATS, export_ndjson, export_csv, parse_ndjson, parse_csv, import_items
+from myapp.etag import collection_version, item_etag, list_etag, etag_matches, not_modified
+
+from django.http import StreamingHttpResponse
+from my_sse_app.streaming import sse_response # for SSE real-time streaming events 
+from my_sse_app.broadcast import BroadcastHub
+from my_sse_app.sse import encode
 from myapp.schema.Event import EventData
-import time
 import random
 from datetime import datetime
 
@@ -22,76 +31,214 @@ router = Router()
 # Create - POST
 @router.post("/items")
 def create_item(request, item: ItemSchema):
-    db_item = Item.objects.create(**item.dict())
+    db_item = insert_item(item.dict())
     return JsonResponse({
         "message": "Item created successfully",
-        "item": json.loads(serialize('json', [db_item]))[0]['fields']
+        "item": item_to_dict(db_item)
     }, status=201)
 
-# Read - GET all items
+# Read - GET all items (keyset paginated, streamed)
 @router.get("/items")
-def list_items(request):
-    items = Item.objects.all()
+def list_items(request, cursor: Optional[str] = None, limit: Optional[int] = None, fields: Optional[str] = None):
+    """
+    List items one page at a time, ordered by id.
+    Pass the returned `next` cursor back as `?cursor=` to get the following page; `next` is null on the last page.
+    `?fields=name` returns (and selects) only id + name
+    """
+    try:
+        page, limit = keyset_slice(Item.objects.all(), cursor, limit)
+        fields = parse_fields(fields)
+    except (InvalidCursor, InvalidFields) as e:
+        return JsonResponse({"message": str(e)}, status=400)
+
+    etag = list_etag(collection_version(), cursor, limit, fields)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response = StreamingHttpResponse(
+        stream_json_page(item_values(page, fields), limit),
+        content_type='application/json'
+    )
+    response['ETag'] = etag
+    return response
+
+# ! /items/search, /items/export, /items/import and /items/bulk are registered before /items/{item_id}, otherwise they would be routed there
+
+# Search - GET ranked full-text matches on name + description
+@router.get("/items/search")
+def search(request, q: str, cursor: Optional[str] = None, limit: Optional[int] = None, fields: Optional[str] = None):
+    """
+    Best match first. Like list_items, pass `next` back as `?cursor=` for the following page
+    """
+    try:
+        items, next_cursor = search_items(q, cursor, limit, parse_fields(fields))
+    except (InvalidCursor, InvalidFields) as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    except SearchUnavailable as e:
+        return JsonResponse({"message": str(e)}, status=501)
     return JsonResponse({
-        "items": json.loads(serialize('json', items))
+        "items": items,
+        "next": next_cursor
     })
 
-# Read - GET single item by id
-@router.get("/items/{item_id}")
-def get_item(request, item_id: int):
-    item = get_object_or_404(Item, id=item_id)
+# Export / Import - stream every item out, or a whole file in, with constant memory
+@router.get("/items/export")
+def export_items(request, format: str = "ndjson", fields: Optional[str] = None):
+    if format not in FORMATS:
+        return JsonResponse({"message": f"Unsupported format: {format}"}, status=400)
+    try:
+        fields = parse_fields(fields)
+    except InvalidFields as e:
+        return JsonResponse({"message": str(e)}, status=400)
+
+    rows = item_values(Item.objects.order_by('id'), fields)
+    stream = export_ndjson(rows) if format == "ndjson" else export_csv(rows, fields)
+    response = StreamingHttpResponse(stream, content_type=FORMATS[format])
+    response['Content-Disposition'] = f'attachment; filename="items.{format}"'
+    return response
+
+@router.post("/items/import")
+def import_items_endpoint(request, format: str = "ndjson", batch_size: Optional[int] = None):
+    """
+    The raw request body is the file (NDJSON: one object per line, CSV: header line with name,description).
+    ! the body is read line by line from the request stream, never as a whole (`request.body`)
+    """
+    if format not in FORMATS:
+        return JsonResponse({"message": f"Unsupported format: {format}"}, status=400)
+    rows = parse_ndjson(request) if format == "ndjson" else parse_csv(request)
+    summary = import_items(rows, clamp_batch_size(batch_size))
     return JsonResponse({
-        "item": json.loads(serialize('json', [item]))[0]['fields']
+        "message": f"{summary['imported']} items imported",
+        **summary
+    }, status=201 if summary['imported'] else 200)
+
+# Bulk - POST / PUT / DELETE many items in one transaction -------------------------
+@router.post("/items/bulk")
+def bulk_create(request, items: List[ItemSchema], batch_size: Optional[int] = None):
+    results = bulk_create_items(items, clamp_batch_size(batch_size))
+    return JsonResponse({
+        "message": f"{len(results)} items created successfully",
+        "results": results
+    }, status=201)
+
+@router.put("/items/bulk")
+def bulk_update(request, items: List[ItemSchema], batch_size: Optional[int] = None):
+    results = bulk_update_items(items, clamp_batch_size(batch_size))
+    updated = sum(1 for result in results if result["status"] == "updated")
+    return JsonResponse({
+        "message": f"{updated} items updated successfully",
+        "results": results
     })
 
-# Update - PUT
-@router.put("/items/{item_id}")
-def update_item(request, item_id: int, data: ItemSchema):
-    item = get_object_or_404(Item, id=item_id)
-    for attr, value in data.dict().items():
-        setattr(item, attr, value)
-    item.save()
+@router.delete("/items/bulk")
+def bulk_delete(request, data: ItemIdsSchema, batch_size: Optional[int] = None):
+    results = bulk_delete_items(data.ids, clamp_batch_size(batch_size))
+    deleted = sum(1 for result in results if result["status"] == "deleted")
     return JsonResponse({
+        "message": f"{deleted} items deleted successfully",
+        "results": results
+    })
+
+# Read - GET single item by id
+def load_item(item_id: int, fields=ITEM_FIELDS):
+    return item_values(Item.objects.filter(id=item_id), with_version(fields)).first()
+
+@router.get("/items/{item_id}")
+def get_item(request, item_id: int, fields: Optional[str] = None):
+    try:
+        fields = parse_fields(fields)
+    except InvalidFields as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    sparse = fields != ITEM_FIELDS
+
+    # ! read-through: hot ids are served from the in-process / Redis cache without a db query.
+    # ! a sparse request on a miss selects only its own columns, and that partial row isn't cached
+    item = item_cache.get_or_load(item_id, lambda item_id: load_item(item_id, fields), store=not sparse)
+    if item is None:
+        raise Http404("No Item matches the given query.")
+
+    etag = item_etag(item_id, item['version'], fields if sparse else ())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response = JsonResponse({
+        "item": project(item, fields)
+    })
+    response['ETag'] = etag
+    return response
+
+def updated_response(item):
+    """The row as written, and its ETag: the client's next conditional GET can use it right away"""
+    response = JsonResponse({
         "message": "Item updated successfully",
-        "item": json.loads(serialize('json', [item]))[0]['fields']
+        "item": item
     })
+    response['ETag'] = item_etag(item['id'], item['version'])
+    return response
+
+# Update - PUT (replaces every field)
+@router.put("/items/{item_id}")
+def update_item(request, item_id: int, data: ItemSchema):
+    fields = data.dict(exclude={"id"})
+    item = update_item_fields(item_id, fields)
+    if item is None:
+        raise Http404("No Item matches the given query.")
+    return updated_response(item)
+
+# Update - PATCH (writes only the fields sent)
+@router.patch("/items/{item_id}")
+def patch_item(request, item_id: int, data: ItemPatchSchema):
+    fields = data.dict(exclude_unset=True)
+    if not fields:
+        return JsonResponse({"message": "No fields to update"}, status=400)
+    item = update_item_fields(item_id, fields)
+    if item is None:
+        raise Http404("No Item matches the given query.")
+    return updated_response(item)
 
 # Delete - DELETE
 @router.delete("/items/{item_id}")
 def delete_item(request, item_id: int):
-    item = get_object_or_404(Item, id=item_id)
-    item.delete()
+    if not delete_items([item_id]):
+        raise Http404("No Item matches the given query.")
     return JsonResponse({
         "message": "Item deleted successfully"
     })
 
 
+# Cache stats - hit/miss counters of the Item read-through cache, for sizing it
+@router.get("/cache/stats")
+def cache_stats(request):
+    return JsonResponse(item_cache.get_stats())
+
+
 # SSE real-time streaming events -------------------------------------
-def event_stream() -> Generator[str, None, None]:
-    """Generate SSE events"""
-    while True:
-        data = EventData(
-            timestamp=datetime.now().strftime('%H:%M:%S'),
-            value=random.randint(1, 100)
-        )
-        
-        # Format as SSE event
-        yield f"data: {data.json()}\n\n"
-        time.sleep(2)
+# ! one ticker per process: the value is drawn and encoded once per tick and broadcast to
+# ! every client, so the cost of a tick doesn't grow with the number of clients
+def ticker_event() -> str:
+    """Generate one SSE event"""
+    data = EventData(
+        timestamp=datetime.now().strftime('%H:%M:%S'),
+        value=random.randint(1, 100)
+    )
+
+    # Format as SSE event
+    return encode(data)
+
+ticker = BroadcastHub(ticker_event, interval=2)
 
 @router.get("/sse")
-def sse_endpoint(request):
+async def sse_endpoint(request):
     """
     Stream real-time events
     Returns random numbers with timestamps every 2 seconds
     """
-    response = StreamingHttpResponse(
-        event_stream(),
-        content_type='text/event-stream' # ! important
-    )
-    response['Cache-Control'] = 'no-cache'
-    response['X-Accel-Buffering'] = 'no'
-    return response
+    return sse_response(request, ticker.stream())
+
+# Ticker stats - connected clients and events dropped for slow ones
+@router.get("/sse/stats")
+def sse_stats(request):
+    return JsonResponse(ticker.get_stats())
 
 
 # Alternative endpoint that sends a single event (useful for testing)
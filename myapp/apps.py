@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MyappConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "myapp"
+
+    def ready(self):
+        # connect the cache invalidation signal handlers
+        from myapp import signals  # noqa: F401
@@ -0,0 +1,96 @@
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+from django.db import transaction
+from django.db.models import F
+
+from myapp.models import Item
+from myapp.schema.Item import ItemSchema
+from myapp.etag import bump_collection_version
+from myapp.cache import invalidate_items
+from myapp.writes import delete_items
+
+# Bulk Item writes -----------------------------------------------------------------
+# ! one transaction per request and one statement per batch, instead of one
+# ! INSERT/UPDATE/DELETE (and one transaction) per row
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 5000
+
+UPDATABLE_FIELDS = ["name", "description", "version"]
+
+
+def clamp_batch_size(batch_size: int = None) -> int:
+    if batch_size is None:
+        return DEFAULT_BATCH_SIZE
+    return max(1, min(batch_size, MAX_BATCH_SIZE))
+
+
+def batched(values: Sequence, size: int) -> Iterator[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def existing_ids(ids: Iterable[int], batch_size: int) -> set:
+    """Which of `ids` exist, looked up `batch_size` ids per query"""
+    found = set()
+    for batch in batched(list(ids), batch_size):
+        found.update(Item.objects.filter(id__in=batch).values_list("id", flat=True))
+    return found
+
+
+def bulk_create_items(items: List[ItemSchema], batch_size: int) -> List[Dict]:
+    """Insert all items in one transaction; ids are handed out by the database"""
+    objs = [Item(**item.dict(exclude={"id"})) for item in items]
+    with transaction.atomic():
+        Item.objects.bulk_create(objs, batch_size=batch_size)
+        bump_collection_version()
+    return [
+        {"index": index, "id": obj.id, "status": "created"}
+        for index, obj in enumerate(objs)
+    ]
+
+
+def bulk_update_items(items: List[ItemSchema], batch_size: int) -> List[Dict]:
+    """
+    Update the items that exist, report `not_found` for the rest.
+    An id sent more than once is written from its first row only, the later ones report `duplicate`
+    """
+    results = []
+    objs = []
+    seen = set()
+    with transaction.atomic():
+        found = existing_ids((item.id for item in items if item.id is not None), batch_size)
+        for index, item in enumerate(items):
+            if item.id is not None and item.id in seen:
+                results.append({"index": index, "id": item.id, "status": "duplicate"})
+                continue
+            seen.add(item.id)
+            if item.id not in found:
+                results.append({"index": index, "id": item.id, "status": "not_found"})
+                continue
+            objs.append(Item(**item.dict(), version=F("version") + 1))
+            results.append({"index": index, "id": item.id, "status": "updated"})
+        Item.objects.bulk_update(objs, UPDATABLE_FIELDS, batch_size=batch_size)
+        if objs:
+            bump_collection_version()
+    # bulk_update sends no post_save, so the cache has to be told explicitly
+    invalidate_items(obj.id for obj in objs)
+    return results
+
+
+def bulk_delete_items(ids: List[int], batch_size: int) -> List[Dict]:
+    """Delete the ids that exist, report `not_found` for the rest and `duplicate` for repeats of an id"""
+    with transaction.atomic():
+        found = existing_ids(ids, batch_size)
+        for batch in batched(list(found), batch_size):
+            delete_items(batch)
+    results = []
+    seen = set()
+    for index, item_id in enumerate(ids):
+        if item_id in seen:
+            status = "duplicate"
+        else:
+            status = "deleted" if item_id in found else "not_found"
+            seen.add(item_id)
+        results.append({"index": index, "id": item_id, "status": status})
+    return results
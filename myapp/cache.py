@@ -0,0 +1,29 @@
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+
+from config.cache import ReadThroughCache, redis_client
+
+# Item row cache ----------------------------------------------------------------
+# ! the rows returned by `.values()`, keyed by id, in the two-tier cache of config/cache.py.
+# Writes invalidate both tiers (see myapp/writes.py and myapp/signals.py)
+
+LOCAL_MAX_SIZE = getattr(settings, "ITEM_CACHE_LOCAL_SIZE", 10000)
+LOCAL_TTL = getattr(settings, "ITEM_CACHE_LOCAL_TTL", 5)  # seconds
+SHARED_TTL = getattr(settings, "ITEM_CACHE_SHARED_TTL", 300)  # seconds
+
+KEY = "myapp:item:{}"
+
+item_cache = ReadThroughCache(KEY, shared=redis_client(), local_max_size=LOCAL_MAX_SIZE,
+                              local_ttl=LOCAL_TTL, shared_ttl=SHARED_TTL)
+
+
+def invalidate_items(item_ids: Iterable[int]) -> None:
+    """
+    Drop rows from both tiers right away, and again once the surrounding write commits:
+    a concurrent reader could otherwise re-cache the old row in between
+    """
+    item_ids = list(item_ids)
+    item_cache.invalidate_many(item_ids)
+    transaction.on_commit(lambda: item_cache.invalidate_many(item_ids))
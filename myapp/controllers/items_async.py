@@ -0,0 +1,108 @@
+"""
+Native async twin of the Item CRUD in myapp/api.py, mounted at /api/myapp/async/.
+! serve it with the ASGI app (config/asgi.py), e.g. `uvicorn config.asgi:application`:
+! a request waiting on the db then holds a coroutine instead of a worker thread.
+Reads use the async ORM (afirst, aiterator). Writes that need a transaction run the
+shared helpers in myapp/writes.py through sync_to_async, since transaction.atomic
+does not work in async code yet.
+"""
+from ninja import Router
+from django.http import JsonResponse, Http404, StreamingHttpResponse
+from typing import Optional
+from asgiref.sync import sync_to_async
+from myapp.models import Item
+from myapp.schema.Item import ItemSchema, ItemPatchSchema
+from myapp.writes import create_item as insert_item, update_item_fields, delete_items
+from myapp.pagination import keyset_slice, InvalidCursor
+from myapp.serializers import (
+    ITEM_FIELDS, InvalidFields, parse_fields, with_version, project, item_to_dict, item_values, astream_json_page
+)
+from myapp.cache import item_cache
+from myapp.api import updated_response
+from myapp.etag import acollection_version, item_etag, list_etag, etag_matches, not_modified
+
+router = Router()
+
+# Create - POST
+@router.post("/items")
+async def create_item(request, item: ItemSchema):
+    db_item = await sync_to_async(insert_item)(item.dict())
+    return JsonResponse({
+        "message": "Item created successfully",
+        "item": item_to_dict(db_item)
+    }, status=201)
+
+# Read - GET all items (keyset paginated, streamed)
+@router.get("/items")
+async def list_items(request, cursor: Optional[str] = None, limit: Optional[int] = None, fields: Optional[str] = None):
+    try:
+        page, limit = keyset_slice(Item.objects.all(), cursor, limit)
+        fields = parse_fields(fields)
+    except (InvalidCursor, InvalidFields) as e:
+        return JsonResponse({"message": str(e)}, status=400)
+
+    etag = list_etag(await acollection_version(), cursor, limit, fields)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response = StreamingHttpResponse(
+        astream_json_page(item_values(page, fields), limit),
+        content_type='application/json'
+    )
+    response['ETag'] = etag
+    return response
+
+# Read - GET single item by id
+async def aload_item(item_id: int, fields=ITEM_FIELDS):
+    return await item_values(Item.objects.filter(id=item_id), with_version(fields)).afirst()
+
+@router.get("/items/{item_id}")
+async def get_item(request, item_id: int, fields: Optional[str] = None):
+    try:
+        fields = parse_fields(fields)
+    except InvalidFields as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    sparse = fields != ITEM_FIELDS
+
+    item = await item_cache.aget_or_load(item_id, lambda item_id: aload_item(item_id, fields), store=not sparse)
+    if item is None:
+        raise Http404("No Item matches the given query.")
+
+    etag = item_etag(item_id, item['version'], fields if sparse else ())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response = JsonResponse({
+        "item": project(item, fields)
+    })
+    response['ETag'] = etag
+    return response
+
+# Update - PUT (replaces every field)
+@router.put("/items/{item_id}")
+async def update_item(request, item_id: int, data: ItemSchema):
+    fields = data.dict(exclude={"id"})
+    item = await sync_to_async(update_item_fields)(item_id, fields)
+    if item is None:
+        raise Http404("No Item matches the given query.")
+    return updated_response(item)
+
+# Update - PATCH (writes only the fields sent)
+@router.patch("/items/{item_id}")
+async def patch_item(request, item_id: int, data: ItemPatchSchema):
+    fields = data.dict(exclude_unset=True)
+    if not fields:
+        return JsonResponse({"message": "No fields to update"}, status=400)
+    item = await sync_to_async(update_item_fields)(item_id, fields)
+    if item is None:
+        raise Http404("No Item matches the given query.")
+    return updated_response(item)
+
+# Delete - DELETE
+@router.delete("/items/{item_id}")
+async def delete_item(request, item_id: int):
+    if not await sync_to_async(delete_items)([item_id]):
+        raise Http404("No Item matches the given query.")
+    return JsonResponse({
+        "message": "Item deleted successfully"
+    })
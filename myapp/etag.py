@@ -0,0 +1,65 @@
+import hashlib
+from typing import Optional, Tuple
+
+from django.db.models import F
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from myapp.models import CollectionVersion
+
+# ETag / conditional GET ---------------------------------------------------------
+# ! ETags are built from version counters, never from the payload, so a matching
+# ! If-None-Match is answered with a 304 before anything is serialized
+
+ITEMS = "items"
+
+
+def collection_version(name: str = ITEMS) -> int:
+    version = CollectionVersion.objects.filter(name=name).values_list("version", flat=True).first()
+    return version or 0
+
+
+async def acollection_version(name: str = ITEMS) -> int:
+    version = await CollectionVersion.objects.filter(name=name).values_list("version", flat=True).afirst()
+    return version or 0
+
+
+def bump_collection_version(name: str = ITEMS) -> None:
+    """Call inside the transaction of every write to the collection"""
+    updated = CollectionVersion.objects.filter(name=name).update(version=F("version") + 1)
+    if not updated:
+        _, created = CollectionVersion.objects.get_or_create(name=name, defaults={"version": 1})
+        if not created:
+            CollectionVersion.objects.filter(name=name).update(version=F("version") + 1)
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:16]
+
+
+def item_etag(item_id: int, version: int, fields: Tuple[str, ...] = ()) -> str:
+    """A sparse fieldset is a different representation, so it gets its own ETag"""
+    if fields:
+        return f'"item-{item_id}-v{version}-{_digest(*fields)}"'
+    return f'"item-{item_id}-v{version}"'
+
+
+def list_etag(version: int, cursor: Optional[str], limit: int, fields: Tuple[str, ...] = ()) -> str:
+    """One ETag per page: the collection version plus the page's cursor, size and fieldset"""
+    return f'"items-v{version}-{_digest(cursor or "", limit, *fields)}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True if the request's If-None-Match already holds `etag`"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    etags = [value.removeprefix("W/") for value in parse_etags(header)]
+    return "*" in etags or etag in etags
+
+
+def not_modified(etag: str) -> HttpResponseNotModified:
+    response = HttpResponseNotModified()
+    response["ETag"] = etag
+    return response
@@ -1,9 +1,41 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 
 # Create your models here.
 class Item(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
+    # bumped on every write, used to build the item's ETag
+    version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def save(self, *args, **kwargs):
+        """
+        Writes made through the model (admin, shell, fixtures) bump the version like the api's
+        UPDATEs do; signals.py bumps the collection version inside the same transaction
+        """
+        if self._state.adding:
+            with transaction.atomic():
+                return super().save(*args, **kwargs)
+        # ! incremented by the database, so two saves of the same stale instance still get two versions
+        self.version = F("version") + 1
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "version" not in update_fields:
+            kwargs["update_fields"] = [*update_fields, "version"]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self.refresh_from_db(fields=["version"])
+
+
+class CollectionVersion(models.Model):
+    """
+    One counter per collection (e.g. "items"), bumped by every write to it.
+    Lets list endpoints answer conditional GETs without reading the collection itself
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name}@{self.version}"
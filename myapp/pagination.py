@@ -0,0 +1,77 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+from django.db.models import QuerySet
+
+# Keyset (cursor) pagination ---------------------------------------------------
+# ! unlike OFFSET, every page is a single `WHERE id > :last ORDER BY id LIMIT n`
+# ! query on the primary key index, so page 1 and page 10,000 cost the same
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    if not isinstance(payload, dict):
+        raise InvalidCursor("Invalid cursor")
+    return payload
+
+
+def _check(value, *types):
+    if not isinstance(value, types) or isinstance(value, bool):
+        raise InvalidCursor("Invalid cursor")
+    return value
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen id as an opaque, url-safe cursor"""
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by `encode_cursor` back to the last seen id"""
+    return _check(_decode(cursor).get("id"), int)
+
+
+def encode_ranked_cursor(score: float, last_id: int) -> str:
+    """Cursor for results ordered by (score, id), e.g. search results"""
+    return _encode({"score": score, "id": last_id})
+
+
+def decode_ranked_cursor(cursor: str) -> Tuple[float, int]:
+    payload = _decode(cursor)
+    return _check(payload.get("score"), int, float), _check(payload.get("id"), int)
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Apply the default page size and the server-side cap"""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_slice(queryset: QuerySet, cursor: Optional[str], limit: Optional[int]) -> Tuple[QuerySet, int]:
+    """
+    Return the queryset for one page ordered by id, and the clamped page size.
+    The slice holds `limit + 1` rows so the caller knows whether there is a next page without a COUNT(*)
+    """
+    limit = clamp_limit(limit)
+    queryset = queryset.order_by("id")
+    if cursor:
+        queryset = queryset.filter(id__gt=decode_cursor(cursor))
+    return queryset[:limit + 1], limit
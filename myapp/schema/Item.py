@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+from typing import List, Optional
 
 class ItemSchema(BaseModel):
     id: int = None
@@ -9,6 +10,24 @@ class ItemSchema(BaseModel):
         orm_mode = True
 
 
+class ItemPatchSchema(BaseModel):
+    """PATCH body: only the fields that are sent get written"""
+    name: Optional[str] = None
+    description: Optional[str] = None
+
+    @field_validator("name", "description")
+    @classmethod
+    def not_null(cls, value):
+        # ! omitted means "leave it", but an explicit null would hit the NOT NULL columns
+        if value is None:
+            raise ValueError("may be omitted, but not null")
+        return value
+
+
+class ItemIdsSchema(BaseModel):
+    ids: List[int]
+
+
 # from pydantic import BaseModel
 # from typing import List, Optional
 
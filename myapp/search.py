@@ -0,0 +1,116 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection
+
+from myapp.pagination import clamp_limit, decode_ranked_cursor, encode_ranked_cursor
+from myapp.serializers import ITEM_FIELDS
+
+# Full-text search over Item name + description ------------------------------------
+# ! backed by a real index, picked by DATABASES['default']['ENGINE']:
+# !   sqlite   -> FTS5 virtual table `myapp_item_fts`, ranked by bm25()
+# !   postgres -> generated tsvector column `search_vector` + GIN index, ranked by ts_rank_cd()
+# Both are created in migrations/0003_item_search_index.py and kept in sync by the
+# database itself (triggers / generated column), so every write path - ORM, bulk, raw
+# deletes, admin - updates the index.
+#
+# Results are ordered by (score, id) with score ascending (bm25 is "lower is better",
+# for postgres we negate ts_rank_cd), and paginated with a (score, id) keyset cursor.
+
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# {columns} is filled from ITEM_FIELDS only (see `select_list`), never from user input
+SQLITE_SEARCH = """
+    SELECT {columns}, score FROM (
+        SELECT {item_columns},
+               bm25(myapp_item_fts, %s, %s) AS score
+        FROM myapp_item_fts
+        JOIN myapp_item i ON i.id = myapp_item_fts.rowid
+        WHERE myapp_item_fts MATCH %s
+    )
+    WHERE %s OR score > %s OR (score = %s AND id > %s)
+    ORDER BY score, id
+    LIMIT %s
+"""
+
+POSTGRES_SEARCH = """
+    SELECT {columns}, score FROM (
+        SELECT {item_columns},
+               -ts_rank_cd(i.search_vector, query) AS score
+        FROM myapp_item i, websearch_to_tsquery('english', %s) query
+        WHERE i.search_vector @@ query
+    ) ranked
+    WHERE %s OR score > %s OR (score = %s AND id > %s)
+    ORDER BY score, id
+    LIMIT %s
+"""
+
+
+class SearchUnavailable(NotImplementedError):
+    """The database has no search index (only sqlite and postgres get one, see the migration)"""
+
+
+def search_engine() -> str:
+    engine = settings.DATABASES["default"]["ENGINE"]
+    if engine.endswith("sqlite3"):
+        return "sqlite"
+    if "postgresql" in engine:
+        return "postgres"
+    raise SearchUnavailable(f"Full-text search is not supported on {engine}")
+
+
+def to_fts5_query(q: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression: every word must match (AND),
+    the last one as a prefix so search-as-you-type works. FTS5 operators in `q` are not honoured
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def select_list(fields: Tuple[str, ...]) -> Dict[str, str]:
+    if not set(fields) <= set(ITEM_FIELDS) or "id" not in fields:
+        raise ValueError(f"Cannot select {fields}")
+    return {
+        "columns": ", ".join(fields),
+        "item_columns": ", ".join(f"i.{field}" for field in fields),
+    }
+
+
+def search_items(q: str, cursor: Optional[str] = None, limit: Optional[int] = None,
+                 fields: Tuple[str, ...] = ITEM_FIELDS) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of items matching `q`, best match first, and the cursor of the next page.
+    Only `fields` (a `serializers.parse_fields` result) are selected
+    """
+    limit = clamp_limit(limit)
+    first_page = cursor is None
+    last_score, last_id = decode_ranked_cursor(cursor) if cursor else (0.0, 0)
+
+    if search_engine() == "sqlite":
+        match = to_fts5_query(q)
+        if match is None:
+            return [], None
+        sql = SQLITE_SEARCH
+        params = [NAME_WEIGHT, DESCRIPTION_WEIGHT, match]
+    else:
+        sql = POSTGRES_SEARCH
+        params = [q]
+    params += [first_page, last_score, last_score, last_id, limit + 1]
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql.format(**select_list(fields)), params)
+        rows = db_cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    items = [dict(zip(fields, row[:-1]), score=row[-1]) for row in rows]
+    id_index = fields.index("id")
+    next_cursor = encode_ranked_cursor(rows[-1][-1], rows[-1][id_index]) if has_more else None
+    return items, next_cursor
@@ -0,0 +1,125 @@
+from typing import AsyncGenerator, Dict, Generator, Iterable, Optional, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from myapp.models import Item
+from myapp.pagination import encode_cursor
+
+# Single-pass Item serializer ---------------------------------------------------
+# ! the old path was serialize('json') -> json.loads -> JsonResponse, i.e. every row was
+# ! encoded, decoded and encoded again. Here rows come straight from .values() as dicts
+# ! and are encoded exactly once
+
+ITEM_FIELDS = ("id", "name", "description", "version")
+
+# one shared encoder instance, so we don't rebuild it for every row
+_encoder = DjangoJSONEncoder(separators=(",", ":"))
+encode = _encoder.encode
+
+# rows fetched from the db per round trip, and rows packed into one chunk of the response
+DEFAULT_CHUNK_SIZE = 500
+
+
+class InvalidFields(ValueError):
+    """Raised for a `fields=` selection naming fields Item doesn't have"""
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Sparse fieldsets: `?fields=name` -> ("id", "name"). `id` is always included (cursors need it),
+    no selection means every field. Unselected columns are then never fetched nor serialized
+    """
+    if not fields:
+        return ITEM_FIELDS
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(ITEM_FIELDS)
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in ITEM_FIELDS if field == "id" or field in requested)
+
+
+def with_version(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    """`fields` plus the version column, which ETags need even when the client didn't ask for it"""
+    return fields if "version" in fields else fields + ("version",)
+
+
+def project(row: Dict, fields: Tuple[str, ...]) -> Dict:
+    return row if len(fields) == len(row) else {field: row[field] for field in fields}
+
+
+def item_to_dict(item: Item) -> Dict:
+    """Plain dict of an Item instance we already have in memory (e.g. right after create/update)"""
+    return {field: getattr(item, field) for field in ITEM_FIELDS}
+
+
+def item_values(queryset: QuerySet, fields: Tuple[str, ...] = ITEM_FIELDS) -> QuerySet:
+    """Project an Item queryset to the dict rows we serialize, selecting only `fields` from the db"""
+    return queryset.values(*fields)
+
+
+def iter_json_array(rows: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[str, None, None]:
+    """
+    Stream `rows` as the elements of a JSON array (without the surrounding brackets),
+    packing `chunk_size` rows into each yielded chunk
+    """
+    buffer = []
+    first = True
+    for row in rows:
+        buffer.append(encode(row))
+        if len(buffer) >= chunk_size:
+            yield ("" if first else ",") + ",".join(buffer)
+            first = False
+            buffer = []
+    if buffer:
+        yield ("" if first else ",") + ",".join(buffer)
+
+
+def stream_json_page(queryset: QuerySet, limit: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[str, None, None]:
+    """
+    Stream one keyset page as `{"items": [...], "next": <cursor or null>}`.
+    `queryset` holds up to `limit + 1` rows (see `pagination.keyset_slice`); the extra row only
+    tells us there is a next page and is never written
+    """
+    last_id: Optional[int] = None
+    has_more = False
+
+    def page_rows():
+        nonlocal last_id, has_more
+        for count, row in enumerate(queryset.iterator(chunk_size=chunk_size)):
+            if count == limit:
+                has_more = True
+                return
+            last_id = row["id"]
+            yield row
+
+    yield '{"items":['
+    yield from iter_json_array(page_rows(), chunk_size)
+    next_cursor = encode_cursor(last_id) if has_more else None
+    yield '],"next":' + encode(next_cursor) + '}'
+
+
+async def astream_json_page(queryset: QuerySet, limit: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncGenerator[str, None]:
+    """Async twin of `stream_json_page` for ASGI handlers: rows come from `aiterator`, the event loop is never blocked"""
+    last_id: Optional[int] = None
+    has_more = False
+    buffer = []
+    first = True
+
+    yield '{"items":['
+    count = 0
+    async for row in queryset.aiterator(chunk_size=chunk_size):
+        if count == limit:
+            has_more = True
+            break
+        count += 1
+        last_id = row["id"]
+        buffer.append(encode(row))
+        if len(buffer) >= chunk_size:
+            yield ("" if first else ",") + ",".join(buffer)
+            first = False
+            buffer = []
+    if buffer:
+        yield ("" if first else ",") + ",".join(buffer)
+    next_cursor = encode_cursor(last_id) if has_more else None
+    yield '],"next":' + encode(next_cursor) + '}'
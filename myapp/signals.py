@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from myapp.models import Item
+from myapp.cache import invalidate_items
+from myapp.etag import bump_collection_version
+
+
+@receiver([post_save, post_delete], sender=Item)
+def invalidate_item_cache(sender, instance, **kwargs):
+    """
+    Keep the Item cache and the list ETags in sync with writes made through the model (api, admin,
+    shell). Runs inside the write's transaction (Item.save, Model.delete), so the bump commits with it
+    """
+    bump_collection_version()
+    invalidate_items([instance.pk])
@@ -0,0 +1,145 @@
+import csv
+import json
+from typing import Dict, Generator, Iterable, Iterator, List, Tuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from myapp.models import Item
+from myapp.etag import bump_collection_version
+from myapp.serializers import encode, DEFAULT_CHUNK_SIZE
+
+# Streaming Item export / import -----------------------------------------------------
+# ! both directions hold at most one chunk / one batch of rows in memory, so moving
+# ! millions of rows doesn't grow the worker's RSS
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+DEFAULT_IMPORT_BATCH_SIZE = 1000
+MAX_ERROR_SAMPLES = 20
+
+NAME_MAX_LENGTH = Item._meta.get_field("name").max_length
+
+
+class _Echo:
+    """csv.writer needs a file; this one just hands back what is written to it"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_ndjson(queryset: QuerySet, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[str, None, None]:
+    """One JSON object per line, `chunk_size` lines per yielded chunk"""
+    buffer = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        buffer.append(encode(row))
+        if len(buffer) >= chunk_size:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def export_csv(queryset: QuerySet, fields: Tuple[str, ...], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Generator[str, None, None]:
+    """A header line, then one CSV line per row, `chunk_size` lines per yielded chunk"""
+    writer = csv.writer(_Echo())
+    buffer = [writer.writerow(fields)]
+    for row in queryset.iterator(chunk_size=chunk_size):
+        buffer.append(writer.writerow([row[field] for field in fields]))
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def parse_ndjson(lines: Iterable[bytes]) -> Iterator[Tuple[int, Dict]]:
+    """(line number, object) for every non-blank line; a line that isn't a JSON object yields its error instead"""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"invalid JSON: {e}")
+            continue
+        yield number, row if isinstance(row, dict) else ValueError("not a JSON object")
+
+
+def parse_csv(lines: Iterable[bytes]) -> Iterator[Tuple[int, Dict]]:
+    """
+    (line number, row) for every CSV record, keyed by the header line; a record that isn't valid
+    UTF-8 or CSV yields its error instead. The number is the file line the record ends on (the
+    header is line 1; a quoted field spanning lines counts all of them)
+    """
+    # ! undecodable bytes are kept as surrogates, so one bad line fails its own record, not the import
+    reader = csv.DictReader(line.decode("utf-8", "surrogateescape") for line in lines)
+    while True:
+        # DictReader.line_num only moves on a good record: count lines on the underlying reader
+        read_before = reader.reader.line_num
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield reader.reader.line_num, ValueError(f"invalid CSV: {e}")
+            if reader.reader.line_num == read_before:
+                return  # nothing more could be read
+            continue
+        try:
+            for value in row.values():
+                if isinstance(value, str):
+                    value.encode("utf-8")
+        except UnicodeEncodeError:
+            yield reader.reader.line_num, ValueError("invalid UTF-8")
+            continue
+        yield reader.reader.line_num, row
+
+
+def to_item(row: Dict) -> Item:
+    """Validate one imported row; ids and versions in the input are ignored, new rows get their own"""
+    if isinstance(row, Exception):
+        raise row
+    name = row.get("name")
+    description = row.get("description") or ""
+    if not isinstance(name, str) or not name:
+        raise ValueError("name is required")
+    if len(name) > NAME_MAX_LENGTH:
+        raise ValueError(f"name is longer than {NAME_MAX_LENGTH} characters")
+    if not isinstance(description, str):
+        raise ValueError("description must be a string")
+    return Item(name=name, description=description)
+
+
+def import_items(rows: Iterable[Tuple[int, Dict]], batch_size: int = DEFAULT_IMPORT_BATCH_SIZE) -> Dict:
+    """
+    Insert rows in fixed-size batches, each `bulk_create` committed on its own, so a bad row or a
+    dropped connection late in a huge file doesn't throw away what was already loaded
+    """
+    summary = {"imported": 0, "errors": 0, "batches": 0, "error_samples": []}
+    batch: List[Item] = []
+
+    def flush():
+        with transaction.atomic():
+            Item.objects.bulk_create(batch, batch_size=batch_size)
+            bump_collection_version()
+        summary["imported"] += len(batch)
+        summary["batches"] += 1
+        batch.clear()
+
+    for number, row in rows:
+        try:
+            batch.append(to_item(row))
+        except ValueError as e:
+            summary["errors"] += 1
+            if len(summary["error_samples"]) < MAX_ERROR_SAMPLES:
+                summary["error_samples"].append({"line": number, "error": str(e)})
+            continue
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return summary
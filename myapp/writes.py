@@ -0,0 +1,86 @@
+from typing import Dict, Iterable, Optional
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from myapp.models import Item
+from myapp.etag import bump_collection_version
+from myapp.cache import invalidate_items
+from myapp.serializers import ITEM_FIELDS, item_values
+
+def create_item(fields: Dict) -> Item:
+    """INSERT one item; the post_save receiver (signals.py) bumps the collection version in the same transaction"""
+    return Item.objects.create(**fields)
+
+
+# Zero-fetch Item writes -----------------------------------------------------------
+# ! one UPDATE / DELETE statement per write, no SELECT first: the affected row
+# ! count tells us whether the row existed (0 -> 404)
+
+
+def update_item_fields(item_id: int, fields: Dict) -> Optional[Dict]:
+    """
+    UPDATE only `fields` (plus the version) of one item and return the row as written - with
+    its new version, for the client's next ETag; None if there is no such item
+    """
+    with transaction.atomic():
+        row = _update_returning(item_id, fields)
+        if row is not None:
+            bump_collection_version()
+    if row is not None:
+        # neither path sends post_save
+        invalidate_items([item_id])
+    return row
+
+
+def _update_returning(item_id: int, fields: Dict) -> Optional[Dict]:
+    if not connection.features.can_return_columns_from_insert:
+        # no RETURNING on this database (e.g. MySQL): the UPDATE, then one primary key read
+        if not Item.objects.filter(id=item_id).update(**fields, version=F("version") + 1):
+            return None
+        return item_values(Item.objects.filter(id=item_id)).first()
+
+    # ! UPDATE ... RETURNING (sqlite >= 3.35, postgres): the written row comes back with the write
+    quote = connection.ops.quote_name
+    assignments, params = [], []
+    for name, value in fields.items():
+        field = Item._meta.get_field(name)
+        assignments.append(f"{quote(field.column)} = %s")
+        params.append(field.get_db_prep_save(value, connection))
+    version = quote(Item._meta.get_field("version").column)
+    sql = (
+        f"UPDATE {quote(Item._meta.db_table)} SET {', '.join(assignments)}, {version} = {version} + 1"
+        f" WHERE {quote(Item._meta.pk.column)} = %s"
+        f" RETURNING {', '.join(quote(Item._meta.get_field(name).column) for name in ITEM_FIELDS)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + [item_id])
+        row = cursor.fetchone()
+    return dict(zip(ITEM_FIELDS, row)) if row is not None else None
+
+
+def delete_items(item_ids: Iterable[int]) -> int:
+    """
+    DELETE the given ids in one statement and return how many rows went.
+    ! QuerySet.delete() SELECTs every row first as soon as any delete signal receiver is
+    ! connected (ours in signals.py is), so we issue the raw DELETE and invalidate the cache
+    ! ourselves. That skips cascades, so it is only taken while nothing references Item:
+    ! once a model gets a relation to it, deletes go through the Collector again
+    """
+    item_ids = list(item_ids)
+    queryset = Item.objects.filter(id__in=item_ids)
+    if Item._meta.related_objects:
+        # cascades, SET_NULL, PROTECT and the post_delete receivers all handled by Django
+        with transaction.atomic():
+            _, per_model = queryset.delete()
+            deleted = per_model.get(Item._meta.label, 0)
+            if deleted:
+                bump_collection_version()
+        return deleted
+    with transaction.atomic():
+        deleted = queryset._raw_delete(queryset.db)
+        if deleted:
+            bump_collection_version()
+    if deleted:
+        invalidate_items(item_ids)
+    return deleted
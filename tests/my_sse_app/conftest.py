@@ -0,0 +1,42 @@
+import asyncio
+
+import fakeredis
+import pytest
+from django.test import Client
+
+from my_sse_app.controllers import task as task_controller
+from my_sse_app.events import TaskEventBus
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    """the task bus on an in-memory Redis stand-in, shared by the sync and the async clients"""
+    server = fakeredis.FakeServer()
+    bus = TaskEventBus(
+        client=fakeredis.FakeRedis(server=server, decode_responses=True),
+        aconnect=lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        block_ms=100,
+    )
+    monkeypatch.setattr(task_controller, "task_bus", bus)
+    monkeypatch.setattr(task_controller, "WORK_DELAY", 0)
+    yield bus
+    task_controller.task_pool.join()  # no run outlives its test
+
+
+@pytest.fixture
+def created_task():
+    return Client().post('/api/sse-tasks/tasks', data={}, content_type='application/json').json()['task_id']
+
+
+@pytest.fixture
+def started_task(created_task):
+    Client().post(f'/api/sse-tasks/tasks/{created_task}/start')
+    return created_task
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """the simulated sessions sleep ~17s in total; skip the waiting, keep the event order"""
+    async def instant(delay, result=None):
+        return result
+    monkeypatch.setattr(asyncio, "sleep", instant)
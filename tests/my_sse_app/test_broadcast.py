@@ -0,0 +1,71 @@
+import asyncio
+import itertools
+import time
+
+from asgiref.sync import async_to_sync
+
+from my_sse_app.broadcast import BroadcastHub
+
+
+def counter_hub(interval=0.01, queue_size=4):
+    counter = itertools.count()
+    return BroadcastHub(lambda: str(next(counter)), interval=interval, queue_size=queue_size)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_every_subscriber_gets_the_same_messages():
+    hub = counter_hub()
+
+    async def read_both():
+        first, second = hub.subscribe(), hub.subscribe()
+        messages = [(await first.get(), await second.get()) for _ in range(3)]
+        hub.unsubscribe(first)
+        hub.unsubscribe(second)
+        return messages
+
+    for first, second in async_to_sync(read_both)():
+        assert first == second
+
+
+def test_slow_subscriber_is_coalesced_not_waited_for():
+    hub = counter_hub(queue_size=4)
+
+    async def read_late():
+        subscription = hub.subscribe()
+        # don't read while the producer ticks on
+        await asyncio.to_thread(wait_for, lambda: hub.get_stats()['ticks'] >= 10)
+        messages = [await subscription.get() for _ in range(4)]
+        hub.unsubscribe(subscription)
+        return messages, subscription.dropped
+
+    messages, dropped = async_to_sync(read_late)()
+    assert dropped >= 6
+    # only the newest messages are kept, in order
+    assert [int(message) for message in messages] == sorted(int(message) for message in messages)
+    assert int(messages[0]) >= 6
+
+
+def test_producer_runs_only_while_someone_listens():
+    hub = counter_hub()
+
+    async def listen():
+        stream = hub.stream()
+        await stream.__anext__()
+        await stream.aclose()
+
+    async_to_sync(listen)()
+    wait_for(lambda: hub._producer is None)
+    ticks = hub.get_stats()['ticks']
+    time.sleep(0.05)
+    assert hub.get_stats()['ticks'] == ticks
+    assert hub.get_stats()['subscribers'] == 0
+
+    # and starts again for the next client
+    async_to_sync(listen)()
+    assert hub.get_stats()['ticks'] > ticks
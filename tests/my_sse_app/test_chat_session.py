@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client
+
+from my_sse_app.api import simulate_chat_session
+from my_sse_app.controllers import sse_with_query
+
+
+def parse_sse(body: bytes):
+    return [json.loads(frame[len("data: "):]) for frame in body.decode().split("\n\n") if frame]
+
+
+def test_simulated_session_is_an_async_generator(no_sleep):
+    async def collect():
+        return [event.type async for event in simulate_chat_session()]
+
+    assert async_to_sync(collect)() == [
+        "chat_start",
+        "task_start", "task_completed",
+        "task_start", "task_completed",
+        "task_start", "task_completed",
+        "chat_completed",
+    ]
+
+
+def test_session_with_query_keeps_the_same_sequence(no_sleep):
+    async def collect():
+        return [event.type async for event in sse_with_query.simulate_chat_session(1, 2)]
+
+    events = async_to_sync(collect)()
+    assert events[0] == "chat_start" and events[-1] == "chat_completed"
+    assert len(events) == 8
+
+
+def test_chat_session_endpoint_streams_asynchronously(no_sleep):
+    async def fetch():
+        response = await AsyncClient().get('/api/sse/chat-session')
+        assert response.is_async  # served from an async iterator, no thread held between events
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        return response, body
+
+    response, body = async_to_sync(fetch)()
+    assert response['Content-Type'] == 'text/event-stream'
+    events = parse_sse(body)
+    assert [event['type'] for event in events][::7] == ["chat_start", "chat_completed"]
+
+
+def test_chat_session_endpoint_still_streams_under_wsgi(no_sleep):
+    """the sync test client goes through the WSGI handler, like runserver and gunicorn"""
+    response = Client().get('/api/sse/chat-session')
+    assert not response.is_async
+    events = parse_sse(b"".join(response.streaming_content))
+    assert len(events) == 8
+
+
+@pytest.mark.django_db  # closing the response fires request_finished, which checks the db connection
+def test_endless_stream_sends_events_one_by_one_under_wsgi(no_sleep):
+    response = Client().get('/api/myapp/sse')
+    first = next(iter(response.streaming_content))
+    response.close()
+    assert first.startswith(b"data: ")
@@ -0,0 +1,43 @@
+import zlib
+
+import pytest
+from django.test import Client, RequestFactory
+
+from my_sse_app.streaming import accepted_encoding, ENCODINGS
+from tests.my_sse_app.test_chat_session import parse_sse
+
+
+@pytest.mark.parametrize("header, encoding", [
+    ("gzip, deflate, br", "gzip"),
+    ("deflate", "deflate"),
+    ("gzip;q=0, deflate;q=0.5", "deflate"),
+    ("*", "gzip"),
+    ("br", None),
+    ("", None),
+])
+def test_accepted_encoding(header, encoding):
+    request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header)
+    assert accepted_encoding(request) == encoding
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate"])
+def test_every_chunk_decodes_on_arrival(no_sleep, encoding):
+    response = Client().get('/api/sse/chat-session', HTTP_ACCEPT_ENCODING=encoding)
+    assert response['Content-Encoding'] == encoding
+    assert response['Vary'] == 'Accept-Encoding'
+
+    decompressor = zlib.decompressobj(ENCODINGS[encoding])
+    events = []
+    for chunk in response.streaming_content:
+        decoded = decompressor.decompress(chunk)
+        # a whole number of events every time: the stream was flushed at the event boundary
+        assert decoded == b"" or decoded.endswith(b"\n\n")
+        events += parse_sse(decoded)
+    assert decompressor.eof
+    assert [event['type'] for event in events][::7] == ["chat_start", "chat_completed"]
+
+
+def test_uncompressed_without_accept_encoding(no_sleep):
+    response = Client().get('/api/sse/chat-session')
+    assert not response.has_header('Content-Encoding')
+    assert len(parse_sse(b"".join(response.streaming_content))) == 8
@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.test import Client
+
+from my_sse_app.controllers import task as task_controller
+from my_sse_app.dag import InvalidGraph, check_graph, run_graph
+from my_sse_app.models import Task, SubTask
+from tests.my_sse_app.test_task_progress import parse_frames, progress
+
+
+def test_check_graph_orders_dependencies_first():
+    assert check_graph({"report": ["a", "b"], "a": [], "b": ["a"]}) == ["a", "b", "report"]
+
+
+@pytest.mark.parametrize("deps, message", [
+    ({"a": ["missing"]}, "unknown"),
+    ({"a": ["b"], "b": ["a"], "c": []}, "cycle"),
+    ({"a": ["a"]}, "cycle"),
+])
+def test_check_graph_rejects(deps, message):
+    with pytest.raises(InvalidGraph, match=message):
+        check_graph(deps)
+
+
+def test_independent_nodes_run_at_the_same_time():
+    running, peak, lock = set(), [0], threading.Lock()
+
+    def run(node):
+        with lock:
+            running.add(node)
+            peak[0] = max(peak[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.discard(node)
+        return True
+
+    with ThreadPoolExecutor(4) as executor:
+        failed = run_graph(["a", "b", "c", "d"], {"a": set(), "b": set(), "c": set(), "d": {"a", "b", "c"}},
+                           run, skip=None, executor=executor)
+
+    assert failed == set()
+    assert peak[0] == 3
+
+
+def test_dependents_of_a_failed_node_are_skipped():
+    ran, skipped = [], []
+
+    def run(node):
+        ran.append(node)
+        return node != "a"
+
+    with ThreadPoolExecutor(2) as executor:
+        failed = run_graph(["a", "b", "c", "d"], {"a": set(), "b": {"a"}, "c": {"b"}, "d": set()},
+                           run, lambda node, reason: skipped.append((node, reason)), executor)
+
+    assert sorted(ran) == ["a", "d"]
+    assert skipped == [("b", "a failed"), ("c", "b failed")]
+    assert failed == {"a", "b", "c"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_task_takes_as_long_as_its_critical_path(bus, created_task, monkeypatch):
+    monkeypatch.setattr(task_controller, "WORK_DELAY", 0.1)  # 4 steps: 0.4s per subtask
+    subtasks = {"subtasks": [
+        {"name": "Extract A"},
+        {"name": "Extract B"},
+        {"name": "Extract C"},
+        {"name": "Report", "depends_on": ["Extract A", "Extract B", "Extract C"]},
+    ]}
+    start = time.perf_counter()
+    Client().post(f'/api/sse-tasks/tasks/{created_task}/start', data=subtasks, content_type='application/json')
+    events = parse_frames(progress(created_task).streaming_content)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.2  # 2 x 0.4s critical path, one after another would be 4 x 0.4s
+    names = [event['subtask_name'] for _, event in events]
+    assert names[-1] == "Report" and len(events) == 4 * 6
+    # the extracts' events are interleaved in the stream, in the order they were emitted
+    assert names[:3] != ["Extract A"] * 3
+    assert Task.objects.get(id=created_task).status == 'completed'
+    assert list(SubTask.objects.get(name="Report").depends_on.values_list('name', flat=True)) == [
+        "Extract A", "Extract B", "Extract C"
+    ]
+
+
+@pytest.mark.django_db
+def test_start_rejects_a_cyclic_graph(created_task):
+    subtasks = {"subtasks": [{"name": "a", "depends_on": ["b"]}, {"name": "b", "depends_on": ["a"]}]}
+    response = Client().post(f'/api/sse-tasks/tasks/{created_task}/start', data=subtasks,
+                             content_type='application/json')
+
+    assert response.status_code == 400
+    assert Task.objects.get(id=created_task).status == 'created'
+    assert not SubTask.objects.exists()
@@ -0,0 +1,50 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import Client
+
+from my_sse_app import api as sse_api
+from my_sse_app.filters import InvalidFilter, compile_filter
+from tests.my_sse_app.test_chat_session import parse_sse
+
+
+def test_no_filter_compiles_to_none():
+    assert compile_filter() is None
+    assert compile_filter("", " , ") is None
+    assert compile_filter("chat_start,chat_completed,task_start,task_completed") is None
+
+
+def test_unknown_type_is_rejected():
+    with pytest.raises(InvalidFilter, match="task_progress"):
+        compile_filter("task_start,task_progress")
+
+
+def test_task_filter_lets_chat_events_through():
+    accept = compile_filter(tasks="analysis")
+    assert accept(sse_api.create_chat_event("chat_start"))
+    assert accept(sse_api.create_task_event(1, "task_start"))  # index 1 is "analysis"
+    assert not accept(sse_api.create_task_event(2, "task_start"))
+
+
+def test_chat_session_filtered_by_type_and_task(no_sleep):
+    response = Client().get('/api/sse/chat-session', {"types": "task_completed", "tasks": "analysis,visualization"})
+    events = parse_sse(b"".join(response.streaming_content))
+    assert [(event["type"], event["taskName"]) for event in events] == [
+        ("task_completed", "analysis"), ("task_completed", "visualization")]
+
+
+def test_chat_session_rejects_unknown_types():
+    response = Client().get('/api/sse/chat-session', {"types": "nope"})
+    assert response.status_code == 400
+    assert "nope" in response.json()["message"]
+
+
+def test_dropped_events_are_never_encoded(no_sleep, monkeypatch):
+    encoded = []
+    monkeypatch.setattr(sse_api, "encode", lambda event: encoded.append(event.type) or "")
+
+    async def drain():
+        async for _ in sse_api.event_stream(compile_filter("chat_start,chat_completed")):
+            pass
+
+    async_to_sync(drain)()
+    assert encoded == ["chat_start", "chat_completed"]
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from my_sse_app.controllers import task as task_controller
+from my_sse_app.models import Task, SubTask
+from my_sse_app.progress import ProgressWriter
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def subtasks():
+    task = Task.objects.create(status='pending')
+    return [SubTask.objects.create(task=task, name=name, order=order)
+            for order, name in enumerate(["Data Validation", "Data Processing", "Report Generation"])]
+
+
+def subtask_updates(queries):
+    return [query for query in queries if query['sql'].startswith('UPDATE "my_sse_app_subtask"')]
+
+
+def test_progress_ticks_are_coalesced(subtasks):
+    writer = ProgressWriter(interval=60)
+    subtask = subtasks[0]
+    subtask.status = 'processing'
+    with CaptureQueriesContext(connection) as queries:
+        writer.record(subtask)  # transition: written now
+        for progress in (20, 40, 60):
+            subtask.progress = progress
+            writer.record(subtask)  # same status, inside the interval: kept in memory
+
+    assert len(subtask_updates(queries)) == 1
+    assert SubTask.objects.get(pk=subtask.pk).progress == 0
+    assert writer.get_stats()['pending'] == 1
+
+    writer.flush()
+    assert SubTask.objects.get(pk=subtask.pk).progress == 60
+
+
+def test_final_status_is_written_at_once(subtasks):
+    writer = ProgressWriter(interval=60)
+    subtask = subtasks[0]
+    subtask.status = 'processing'
+    writer.record(subtask)
+    subtask.status, subtask.progress, subtask.message = 'completed', 100, "done"
+    writer.record(subtask)
+
+    stored = SubTask.objects.get(pk=subtask.pk)
+    assert (stored.status, stored.progress, stored.message) == ('completed', 100, "done")
+    assert writer.get_stats()['pending'] == 0
+
+
+def test_one_write_for_many_subtasks(subtasks):
+    writer = ProgressWriter(interval=60)
+    for subtask in subtasks:
+        subtask.status = 'processing'
+        writer.record(subtask)
+    for subtask in subtasks:
+        subtask.progress = 50
+        writer.record(subtask)
+
+    with CaptureQueriesContext(connection) as queries:
+        writer.flush()
+
+    assert len(subtask_updates(queries)) == 1
+    assert set(SubTask.objects.values_list('progress', flat=True)) == {50}
+
+
+@pytest.mark.django_db(transaction=True)  # subtasks run on the subtask pool's threads
+def test_task_run_writes_each_subtask_twice_instead_of_six_times(bus, subtasks, monkeypatch):
+    writer = ProgressWriter(interval=60)
+    monkeypatch.setattr(task_controller, "progress_writer", writer)
+
+    task_controller.run_task(subtasks[0].task_id)
+
+    # processing + completed per subtask at most (these three are independent and run at
+    # once, so transitions can share a flush); the 4 progress ticks in between never hit the db
+    assert writer.get_stats()['recorded'] == 6 * len(subtasks)
+    assert writer.get_stats()['flushes'] <= 2 * len(subtasks)
+    assert set(SubTask.objects.values_list('status', 'progress')) == {('completed', 100)}
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from my_sse_app.models import Task
+from my_sse_app.progress import ProgressWriter
+from my_sse_app.snapshots import overall_progress, task_snapshots
+from my_sse_app.task_templates import get_template
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def local_snapshots_only(monkeypatch):
+    monkeypatch.setattr(task_snapshots, "shared", None)
+    task_snapshots.local.clear()
+    yield
+    task_snapshots.local.clear()
+
+
+@pytest.fixture
+def task():
+    task = Task.objects.create(status='processing')
+    get_template("default").instantiate(task)
+    return task
+
+
+def snapshot(task_id):
+    return Client().get(f'/api/sse-tasks/tasks/{task_id}')
+
+
+def test_snapshot_is_two_queries_then_cached(task):
+    with CaptureQueriesContext(connection) as queries:
+        body = snapshot(task.id).json()
+    assert len(queries) == 2  # the task, its subtasks
+    assert body['status'] == 'processing' and body['progress'] == 0
+    assert [subtask['name'] for subtask in body['subtasks']] == [
+        "Data Validation", "Data Processing", "Report Generation"]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert snapshot(task.id).json() == body
+    assert len(queries) == 0
+
+
+def test_progress_flush_invalidates_the_snapshot(task):
+    snapshot(task.id)
+    writer = ProgressWriter(interval=60)
+    subtask = task.subtasks.get(name="Data Processing")
+    subtask.status, subtask.progress = 'processing', 40
+    writer.record(subtask)  # transition: flushed now
+
+    body = snapshot(task.id).json()
+    assert body['subtasks'][1]['progress'] == 40
+    assert body['progress'] == round(3 * 40 / 5)  # Data Processing weighs 3 of 5
+
+
+def test_status_save_invalidates_the_snapshot(task):
+    snapshot(task.id)
+    task.status = 'completed'
+    task.save()
+    body = snapshot(task.id).json()
+    assert body['status'] == 'completed' and body['progress'] == 100
+
+
+def test_unknown_task_is_404():
+    assert snapshot("6b1f7c1e-0000-4000-8000-000000000000").status_code == 404
+
+
+def test_overall_progress_weights():
+    subtasks = [{"weight": 1, "progress": 100}, {"weight": 3, "progress": 0}]
+    assert overall_progress('processing', subtasks) == 25
+    assert overall_progress('processing', []) == 0
+    assert overall_progress('completed', subtasks) == 100
@@ -0,0 +1,38 @@
+from asgiref.sync import async_to_sync
+
+from my_sse_app.api import create_task_event
+from my_sse_app.broadcast import Topic
+from my_sse_app.sse import encode, pack
+
+
+def test_models_encode_like_pydantic_json():
+    event = create_task_event(1, "task_start")
+    assert encode(event) == f"data: {event.json()}\n\n"
+
+
+def test_dicts_encode_compact():
+    assert encode({"a": 1, "b": [None, "x"]}) == 'data: {"a":1,"b":[null,"x"]}\n\n'
+
+
+def test_optional_fields():
+    assert encode("hi", id="7", event="progress", retry=3000) == "id: 7\nevent: progress\nretry: 3000\ndata: hi\n\n"
+
+
+def test_multiline_data_is_split_into_data_lines():
+    assert encode("one\ntwo") == "data: one\ndata: two\n\n"
+
+
+def test_pack_joins_frames():
+    assert pack([encode(1), encode(2)]) == "data: 1\n\ndata: 2\n\n"
+
+
+def test_a_subscriber_that_fell_behind_gets_one_chunk():
+    topic = Topic()
+
+    async def read():
+        stream = topic.stream(backlog=[encode(n) for n in range(3)])
+        chunk = await stream.__anext__()
+        await stream.aclose()
+        return chunk
+
+    assert async_to_sync(read)() == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import Client
+
+from my_sse_app.controllers import task as task_controller
+from my_sse_app.events import parse_last_event_id
+from my_sse_app.models import Task, SubTask
+
+# the task runs in a background thread, which needs to see committed rows
+pytestmark = pytest.mark.django_db(transaction=True)
+
+EVENTS_PER_RUN = 3 * 6  # 3 subtasks x (start, 4 steps, completed)
+
+
+def parse_frames(chunks):
+    events = []
+    for frame in b"".join(chunks).decode().split("\n\n"):
+        if frame and not frame.startswith(":"):
+            id_line, data_line = frame.split("\n")
+            events.append((id_line[len("id: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+
+def progress(task_id, **headers):
+    return Client().get(f'/api/sse-tasks/tasks/{task_id}/progress', **headers)
+
+
+def test_events_carry_increasing_ids(bus, started_task):
+    events = parse_frames(progress(started_task).streaming_content)
+
+    ids = [event_id for event_id, _ in events]
+    assert len(ids) == EVENTS_PER_RUN
+    assert ids == sorted(ids, key=lambda event_id: tuple(map(int, event_id.split("-"))))
+    assert events[-1][1]['status'] == 'completed'
+    assert Task.objects.get(id=started_task).status == 'completed'
+
+
+def test_reconnect_replays_only_missed_events_without_rerunning(bus, started_task):
+    first_run = parse_frames(progress(started_task).streaming_content)
+    updated = list(SubTask.objects.values_list('updated_at', flat=True))
+
+    events = parse_frames(progress(started_task, HTTP_LAST_EVENT_ID=first_run[4][0]).streaming_content)
+
+    assert events == first_run[5:]
+    assert list(SubTask.objects.values_list('updated_at', flat=True)) == updated
+
+
+def test_reconnect_mid_run_attaches_to_the_live_stream(bus, started_task, monkeypatch):
+    monkeypatch.setattr(task_controller, "WORK_DELAY", 0.01)
+    response = progress(started_task)
+    chunks = iter(response.streaming_content)
+    seen = parse_frames([next(chunks), next(chunks)])
+    response.close()  # the browser drops the connection
+
+    events = parse_frames(progress(started_task, HTTP_LAST_EVENT_ID=seen[-1][0]).streaming_content)
+
+    assert len(seen + events) == EVENTS_PER_RUN  # no gap, no duplicate
+    assert len({event_id for event_id, _ in seen + events}) == EVENTS_PER_RUN
+
+
+def test_run_survives_the_client_disconnecting(bus, started_task, monkeypatch):
+    monkeypatch.setattr(task_controller, "WORK_DELAY", 0.01)
+    response = progress(started_task)
+    next(iter(response.streaming_content))
+    response.close()
+
+    task_controller.task_pool.join()
+
+    assert Task.objects.get(id=started_task).status == 'completed'
+    assert set(SubTask.objects.values_list('status', flat=True)) == {'completed'}
+
+
+def test_progress_is_a_pure_subscriber(bus, created_task):
+    # a worker (maybe another process) is running the task and publishing
+    Task.objects.filter(id=created_task).update(status='processing')
+    bus.publish(created_task, {"status": "processing", "progress": 40})
+    bus.finish(created_task)
+
+    events = parse_frames(progress(created_task).streaming_content)
+
+    assert [event for _, event in events] == [{"status": "processing", "progress": 40}]
+    assert task_controller.task_pool.get_stats()['queued'] == 0
+    assert Task.objects.get(id=created_task).status == 'processing'  # nothing ran here
+
+
+def test_idle_stream_sends_keepalives(bus, created_task):
+    response = progress(created_task)
+    assert next(iter(response.streaming_content)) == b": keepalive\n\n"
+    response.close()
+
+
+def test_finished_task_with_expired_events_is_not_rerun(bus, created_task):
+    Task.objects.filter(id=created_task).update(status='completed')
+
+    body = b"".join(progress(created_task).streaming_content).decode()
+
+    assert json.loads(body[len("data: "):])['status'] == 'completed'
+
+
+def test_stream_is_trimmed_and_expires(bus):
+    bus.max_length = 10
+    for n in range(500):
+        bus.publish("t", {"n": n})
+
+    # MAXLEN ~ trims whole stream nodes (100 entries by default), so the length is approximate
+    assert bus.client.xlen(bus.key("t")) <= 200
+    assert 0 < bus.client.ttl(bus.key("t")) <= bus.ttl
+
+
+def test_tail_resumes_after_last_event_id(bus):
+    ids = [bus.publish("t", {"n": n}) for n in range(3)]
+    bus.finish("t")
+
+    async def collect(last_event_id):
+        return [chunk async for chunk in bus.stream("t", last_event_id)]
+
+    chunks = async_to_sync(collect)(None)
+    assert len(chunks) == 1  # the events one XREAD returned are sent as one chunk
+    assert [event for _, event in parse_frames([chunk.encode() for chunk in chunks])] == [{"n": n} for n in range(3)]
+    assert async_to_sync(collect)(ids[1]) == [f'id: {ids[2]}\ndata: {{"n":2}}\n\n']
+
+
+def test_parse_last_event_id():
+    assert parse_last_event_id("1700000000000-3") == "1700000000000-3"
+    assert parse_last_event_id("5") is None
+    assert parse_last_event_id(None) is None
@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from my_sse_app.dag import InvalidGraph
+from my_sse_app.models import Task, SubTask
+from my_sse_app.task_templates import SubTaskTemplate, TaskTemplate, UnknownTemplate, get_template
+
+pytestmark = pytest.mark.django_db
+
+
+def create(**data):
+    return Client().post('/api/sse-tasks/tasks', data=data, content_type='application/json')
+
+
+def test_instantiate_is_two_inserts_for_any_number_of_subtasks():
+    template = TaskTemplate("wide", [SubTaskTemplate("Setup")] + [
+        SubTaskTemplate(f"Step {n}", weight=n % 3 + 1, depends_on=["Setup"]) for n in range(49)
+    ])
+    task = Task.objects.create()
+    with CaptureQueriesContext(connection) as queries:
+        created = template.instantiate(task)
+    inserts = [query for query in queries if query['sql'].startswith('INSERT')]
+    assert len(inserts) == 2
+    assert len(created) == 50 and all(subtask.pk for subtask in created)
+    step = SubTask.objects.get(task=task, name="Step 4")
+    assert [dependency.name for dependency in step.depends_on.all()] == ["Setup"]
+    assert step.weight == 2 and step.order == 5
+
+
+def test_template_is_chosen_at_create_and_used_on_start(bus):
+    task_id = create(template="etl").json()['task_id']
+    assert Task.objects.get(id=task_id).template == "etl"
+    Client().post(f'/api/sse-tasks/tasks/{task_id}/start')
+
+    subtasks = {subtask.name: subtask for subtask in SubTask.objects.filter(task_id=task_id)}
+    assert list(subtasks) == [subtask.name for subtask in get_template("etl").subtasks]
+    assert {dependency.name for dependency in subtasks["Transform"].depends_on.all()} == {
+        "Extract Orders", "Extract Customers"}
+    assert subtasks["Transform"].weight == 3
+
+
+def test_unknown_template_is_rejected():
+    response = create(template="nope")
+    assert response.status_code == 400
+    assert "nope" in response.json()['message']
+    assert not Task.objects.exists()
+
+
+@pytest.mark.parametrize("subtasks", [
+    [],
+    [SubTaskTemplate("A"), SubTaskTemplate("A")],
+    [SubTaskTemplate("A", depends_on=["B"])],
+    [SubTaskTemplate("A", depends_on=["B"]), SubTaskTemplate("B", depends_on=["A"])],
+])
+def test_invalid_templates_fail_when_built(subtasks):
+    with pytest.raises(InvalidGraph):
+        TaskTemplate("broken", subtasks)
+
+
+def test_get_template_unknown():
+    with pytest.raises(UnknownTemplate):
+        get_template("nope")
@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import Client
+
+from my_sse_app import topics
+from my_sse_app.topics import TopicRegistry
+from tests.my_sse_app.test_broadcast import wait_for
+from tests.my_sse_app.test_chat_session import parse_sse
+
+
+class Counter:
+    """Source of 0, 1, 2, ... per key, recording how many were started and how many ended"""
+
+    def __init__(self, limit=None, delay=0.005):
+        self.limit = limit
+        self.delay = delay
+        self.started = []
+        self.ended = []
+
+    async def __call__(self, key):
+        self.started.append(key)
+        try:
+            for n in itertools.islice(itertools.count(), self.limit):
+                # ! sleep first: subscribers started together all see event 0
+                await asyncio.sleep(self.delay)
+                yield {"key": key, "n": n}
+        finally:
+            self.ended.append(key)
+
+
+def read(registry, key, count):
+    async def collect():
+        stream = registry.stream(key)
+        events = []
+        async for chunk in stream:
+            events += parse_sse(chunk.encode())
+            if len(events) >= count:
+                break
+        await stream.aclose()
+        return events
+    return collect()
+
+
+def test_subscribers_of_a_key_share_one_source():
+    source = Counter()
+    registry = TopicRegistry(source)
+
+    async def both():
+        return await asyncio.gather(read(registry, (1, 2), 5), read(registry, (1, 2), 5), read(registry, (3, 4), 5))
+
+    first, second, other = async_to_sync(both)()
+    assert source.started == [(1, 2), (3, 4)]
+    assert all(event["key"] == [1, 2] for event in first + second)
+    assert all(event["key"] == [3, 4] for event in other)
+    assert first[:5] == second[:5]
+
+
+def test_last_unsubscribe_collects_the_topic_and_cancels_its_source():
+    source = Counter()
+    registry = TopicRegistry(source)
+    async_to_sync(lambda: read(registry, "project", 3))()
+
+    wait_for(lambda: source.ended == ["project"])
+    assert registry.get_stats() == {"topics": 0, "started": 1, "collected": 1, "subscribers": 0}
+
+    # a later subscriber starts a fresh source
+    async_to_sync(lambda: read(registry, "project", 1))()
+    assert source.started == ["project", "project"]
+
+
+def test_exhausted_source_ends_every_stream():
+    registry = TopicRegistry(Counter(limit=3))
+
+    async def whole():
+        return [chunk async for chunk in registry.stream("k")]
+
+    assert "".join(async_to_sync(whole)()).count("data: ") == 3
+    wait_for(lambda: registry.get_stats()["topics"] == 0)
+
+
+def test_each_event_is_encoded_once_per_topic(monkeypatch):
+    encoded = []
+    monkeypatch.setattr(topics, "encode", lambda event: encoded.append(event["n"]) or f"data: {event['n']}\n\n")
+    registry = TopicRegistry(Counter(limit=4, delay=0.02))
+
+    async def three_subscribers():
+        async def whole(accept=None):
+            return [chunk async for chunk in registry.stream("k", accept)]
+        return await asyncio.gather(whole(), whole(), whole(lambda event: event["n"] % 2 == 0))
+
+    everything, _, even = async_to_sync(three_subscribers)()
+    assert "".join(everything) == "data: 0\n\ndata: 1\n\ndata: 2\n\ndata: 3\n\n"
+    assert "".join(even) == "data: 0\n\ndata: 2\n\n"
+    assert sorted(encoded) == [0, 1, 2, 3]
+
+
+def test_filtered_out_by_everyone_is_never_encoded(monkeypatch):
+    encoded = []
+    monkeypatch.setattr(topics, "encode", lambda event: encoded.append(event["n"]) or "")
+    registry = TopicRegistry(Counter(limit=4))
+
+    async def whole():
+        return [chunk async for chunk in registry.stream("k", lambda event: event["n"] == 3)]
+
+    async_to_sync(whole)()
+    assert encoded == [3]
+
+
+@pytest.mark.django_db
+def test_project_chat_session_endpoint(no_sleep):
+    response = Client().get('/api/sse-projects/users/1/projects/2/chat-session', {"types": "chat_start,chat_completed"})
+    assert [event["type"] for event in parse_sse(b"".join(response.streaming_content))] == [
+        "chat_start", "chat_completed"]
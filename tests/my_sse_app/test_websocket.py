@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+import msgpack
+from asgiref.sync import async_to_sync
+
+from config.asgi import application
+from my_sse_app import websocket
+from my_sse_app.api import create_chat_event
+
+
+class Client:
+    """The client end of one ASGI WebSocket connection to config.asgi.application"""
+
+    def __init__(self, path="/ws/chat-session", query="", subprotocols=()):
+        self.scope = {"type": "websocket", "path": path, "query_string": query.encode(),
+                      "subprotocols": list(subprotocols), "headers": []}
+        self.inbox = asyncio.Queue()
+        self.outbox = asyncio.Queue()
+
+    async def connect(self):
+        self.app = asyncio.ensure_future(application(self.scope, self.inbox.get, self.outbox.put))
+        await self.inbox.put({"type": "websocket.connect"})
+        return await self.next()
+
+    async def next(self, timeout=1):
+        return await asyncio.wait_for(self.outbox.get(), timeout)
+
+    async def message(self):
+        frame = await self.next()
+        if frame["type"] == "websocket.close":
+            return frame
+        return json.loads(frame["text"]) if "text" in frame else msgpack.unpackb(frame["bytes"])
+
+    async def tell(self, message, binary=False):
+        frame = {"bytes": msgpack.packb(message)} if binary else {"text": json.dumps(message)}
+        await self.inbox.put({"type": "websocket.receive", **frame})
+
+    async def until_closed(self):
+        messages = []
+        while True:
+            message = await self.message()
+            messages.append(message)
+            if message.get("type") == "websocket.close":
+                await self.app
+                return messages
+
+
+def run(test):
+    return async_to_sync(test)()
+
+
+def test_json_session_then_end(no_sleep):
+    async def session():
+        client = Client()
+        assert (await client.connect()) == {"type": "websocket.accept", "subprotocol": None}
+        return await client.until_closed()
+
+    messages = run(session)
+    events = [message["event"]["type"] for message in messages if "event" in message]
+    assert events == ["chat_start"] + ["task_start", "task_completed"] * 3 + ["chat_completed"]
+    assert [message["seq"] for message in messages[:-2]] == list(range(1, 9))
+    assert messages[-2] == {"end": True, "seq": 8}
+    assert messages[-1] == {"type": "websocket.close", "code": 1000}
+
+
+def test_msgpack_is_negotiated_by_subprotocol(no_sleep):
+    async def session():
+        client = Client(subprotocols=["msgpack", "json"], query="types=chat_start,chat_completed")
+        accepted = await client.connect()
+        first = await client.next()
+        return accepted, first, await client.until_closed()
+
+    accepted, first, rest = run(session)
+    assert accepted["subprotocol"] == "msgpack"
+    assert msgpack.unpackb(first["bytes"])["event"]["type"] == "chat_start"
+    assert rest[0]["event"]["type"] == "chat_completed"  # filtered server-side
+
+
+def test_unacked_events_stop_the_producer_until_an_ack(no_sleep):
+    async def session():
+        client = Client(query="buffer=2")
+        await client.connect()
+        first = [await client.message(), await client.message()]
+        try:
+            await client.next(timeout=0.1)
+            stalled = False
+        except asyncio.TimeoutError:
+            stalled = True
+        await client.tell({"ack": 2})
+        after_ack = [await client.message(), await client.message()]
+        await client.tell({"cancel": True})
+        return first, stalled, after_ack, await client.until_closed()
+
+    first, stalled, after_ack, closing = run(session)
+    assert [message["seq"] for message in first + after_ack] == [1, 2, 3, 4]
+    assert stalled
+    assert closing == [{"cancelled": True, "seq": 4}, {"type": "websocket.close", "code": 1000}]
+
+
+def test_cancel_closes_the_session(no_sleep, monkeypatch):
+    closed = []
+
+    async def endless():
+        try:
+            while True:
+                yield create_chat_event("chat_start")
+                await asyncio.sleep(0.01)
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(websocket, "simulate_chat_session", endless)
+
+    async def session():
+        client = Client(subprotocols=["msgpack"])
+        await client.connect()
+        await client.message()
+        await client.tell({"cancel": True}, binary=True)
+        return await client.until_closed()
+
+    messages = run(session)
+    assert messages[-2]["cancelled"] is True
+    assert messages[-1] == {"type": "websocket.close", "code": 1000}
+    assert closed == [True]
+
+
+def test_invalid_connections_are_rejected_at_the_handshake():
+    async def handshake(**kwargs):
+        return await Client(**kwargs).connect()
+
+    for kwargs in ({"query": "types=nope"}, {"query": "buffer=0"}, {"query": "format=xml"}, {"path": "/ws/nope"}):
+        assert run(lambda: handshake(**kwargs)) == {"type": "websocket.close", "code": 1008}
+
+
+def test_garbage_from_the_client_closes_with_1007(no_sleep):
+    async def session():
+        client = Client(query="buffer=1")
+        await client.connect()
+        await client.message()
+        await client.inbox.put({"type": "websocket.receive", "text": "not json"})
+        return await client.until_closed()
+
+    assert run(session)[-1] == {"type": "websocket.close", "code": 1007}
+
+
+def test_acks_must_be_integers(no_sleep):
+    async def session(text):
+        client = Client(query="buffer=1")
+        await client.connect()
+        await client.message()
+        await client.inbox.put({"type": "websocket.receive", "text": text})
+        return await client.until_closed()
+
+    for text in ('{"ack": 1e400}', '{"ack": 3.7}', '{"ack": true}', '{"ack": "1"}'):
+        assert run(lambda: session(text))[-1] == {"type": "websocket.close", "code": 1007}
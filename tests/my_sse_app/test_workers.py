@@ -0,0 +1,46 @@
+import threading
+import time
+
+from my_sse_app.workers import WorkerPool
+
+
+def test_runs_queue_behind_busy_workers():
+    pool = WorkerPool(size=1)
+    release = threading.Event()
+    pool.submit(release.wait)
+    pool.submit(release.wait)
+    time.sleep(0.05)
+
+    stats = pool.get_stats()
+    assert (stats['busy'], stats['queued']) == (1, 1)
+
+    release.set()
+    pool.join()
+    stats = pool.get_stats()
+    assert (stats['busy'], stats['queued'], stats['completed']) == (0, 0, 2)
+    assert stats['avg_wait_ms'] > 0
+    pool.shutdown()
+
+
+def test_utilisation_is_the_share_of_worker_time_spent_working():
+    pool = WorkerPool(size=2)
+    pool.submit(time.sleep, 0.2)
+    pool.join()
+    time.sleep(0.2)
+
+    # one of two workers busy for about half of the pool's lifetime
+    assert 0.1 < pool.get_stats()['utilisation'] < 0.4
+    pool.shutdown()
+
+
+def test_a_failing_run_does_not_take_down_its_worker():
+    pool = WorkerPool(size=1)
+    done = []
+    pool.submit(lambda: 1 / 0)
+    pool.submit(done.append, "ok")
+    pool.join()
+
+    assert done == ["ok"]
+    stats = pool.get_stats()
+    assert (stats['completed'], stats['failed']) == (1, 1)
+    pool.shutdown()
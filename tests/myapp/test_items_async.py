@@ -0,0 +1,100 @@
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+
+from myapp.cache import item_cache
+from myapp.models import Item
+
+
+@pytest.fixture(autouse=True)
+def clear_item_cache():
+    item_cache.local.clear()
+    yield
+    item_cache.local.clear()
+
+
+@pytest.fixture
+def async_client():
+    return AsyncClient()
+
+
+@pytest.fixture
+def create_sample_item():
+    return Item.objects.create(name="Test Item", description="Test Description")
+
+
+async def read_streamed_json(response):
+    """the async list endpoint streams its body through an async iterator"""
+    chunks = [chunk async for chunk in response.streaming_content]
+    return json.loads(b"".join(chunks))
+
+
+@pytest.mark.django_db
+class TestAsyncItemAPI:
+    """
+    /api/myapp/async/ is the native async twin of /api/myapp/.
+    ! plain sync tests driving the AsyncClient through async_to_sync, so no async pytest plugin is needed
+    """
+
+    def test_create_item(self, async_client):
+        response = async_to_sync(async_client.post)(
+            '/api/myapp/async/items',
+            data=json.dumps({"name": "Test Item", "description": "Test Description"}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 201
+        assert response.json()['item']['name'] == "Test Item"
+        assert Item.objects.count() == 1
+
+    def test_list_items(self, async_client, create_sample_item):
+        async def list_items():
+            response = await async_client.get('/api/myapp/async/items?limit=10')
+            return response, await read_streamed_json(response)
+
+        response, body = async_to_sync(list_items)()
+        assert response.status_code == 200
+        assert [item['id'] for item in body['items']] == [create_sample_item.id]
+        assert body['next'] is None
+
+    def test_get_item_and_etag(self, async_client, create_sample_item):
+        response = async_to_sync(async_client.get)(f'/api/myapp/async/items/{create_sample_item.id}')
+        assert response.status_code == 200
+        assert response.json()['item']['name'] == create_sample_item.name
+
+        response = async_to_sync(async_client.get)(
+            f'/api/myapp/async/items/{create_sample_item.id}',
+            headers={"If-None-Match": response['ETag']}
+        )
+        assert response.status_code == 304
+
+    def test_patch_item(self, async_client, create_sample_item):
+        response = async_to_sync(async_client.patch)(
+            f'/api/myapp/async/items/{create_sample_item.id}',
+            data=json.dumps({"name": "Patched Item"}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        assert Item.objects.get(id=create_sample_item.id).name == "Patched Item"
+        assert response.json()['item']['version'] == create_sample_item.version + 1
+        assert response['ETag'] == f'"item-{create_sample_item.id}-v{create_sample_item.version + 1}"'
+
+    def test_patch_rejects_null_fields(self, async_client, create_sample_item):
+        response = async_to_sync(async_client.patch)(
+            f'/api/myapp/async/items/{create_sample_item.id}',
+            data=json.dumps({"description": None}),
+            content_type='application/json'
+        )
+        assert response.status_code == 422
+        assert Item.objects.get(id=create_sample_item.id).description == create_sample_item.description
+
+    def test_delete_item(self, async_client, create_sample_item):
+        response = async_to_sync(async_client.delete)(f'/api/myapp/async/items/{create_sample_item.id}')
+        assert response.status_code == 200
+        assert Item.objects.count() == 0
+
+        response = async_to_sync(async_client.delete)(f'/api/myapp/async/items/{create_sample_item.id}')
+        assert response.status_code == 404
@@ -1,8 +1,33 @@
 import pytest
+from asgiref.sync import async_to_sync
 from django.test import Client
 from django.urls import reverse
 from myapp.models import Item
+from myapp.serializers import iter_json_array
+from myapp.transfer import parse_csv
+from myapp.writes import delete_items
+from config.cache import LRUCache, ReadThroughCache
+from myapp.cache import KEY, item_cache
+from myapp.api import ticker_event, ticker
+import csv
+import importlib
 import json
+from types import SimpleNamespace
+import fakeredis
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+
+def streamed_json(response):
+    """list endpoints stream their body, so `response.json()` is not available"""
+    return json.loads(b"".join(response.streaming_content))
+
+@pytest.fixture(autouse=True)
+def clear_item_cache():
+    """ids are reused across tests (each test is rolled back), so never let a cached row leak between them"""
+    item_cache.local.clear()
+    yield
+    item_cache.local.clear()
 
 @pytest.fixture
 def client():
@@ -74,9 +99,9 @@ class TestItemAPI:
         response = client.get('/api/myapp/items') 
         
         assert response.status_code == 200
-        items = response.json()['items']
+        items = streamed_json(response)['items']
         assert len(items) == 1
-        assert items[0]['fields']['name'] == create_sample_item.name
+        assert items[0]['name'] == create_sample_item.name
 
     def test_get_item_by_id(self, client, create_sample_item):
         response = client.get(f'/api/myapp/items/{create_sample_item.id}')
@@ -85,6 +110,7 @@ class TestItemAPI:
         item = response.json()['item']
         assert item['name'] == create_sample_item.name
         assert item['description'] == create_sample_item.description
+        assert item['id'] == create_sample_item.id
 
     def test_get_nonexistent_item(self, client):
         response = client.get('/api/myapp/items/999')
@@ -127,4 +153,586 @@ class TestItemAPI:
 
     def test_delete_nonexistent_item(self, client):
         response = client.delete('/api/myapp/items/999')
-        assert response.status_code == 404
\ No newline at end of file
+        assert response.status_code == 404
+
+@pytest.mark.django_db
+class TestItemPagination:
+    """
+    list_items is keyset paginated: `?limit=` sets the page size, `next` is the cursor of the following page
+    """
+
+    @pytest.fixture
+    def many_items(self):
+        return Item.objects.bulk_create(
+            [Item(name=f"Item {i}", description=f"Description {i}") for i in range(5)]
+        )
+
+    def test_pages_cover_all_items_in_order(self, client, many_items):
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/myapp/items?limit=2' + (f'&cursor={cursor}' if cursor else '')
+            body = streamed_json(client.get(url))
+            seen += [item['id'] for item in body['items']]
+            cursor = body['next']
+            if cursor is None:
+                break
+
+        assert seen == sorted(item.id for item in many_items)
+
+    def test_last_page_has_no_next_cursor(self, client, many_items):
+        body = streamed_json(client.get('/api/myapp/items?limit=5'))
+        assert len(body['items']) == 5
+        assert body['next'] is None
+
+    def test_limit_is_capped(self, client, many_items, monkeypatch):
+        monkeypatch.setattr('myapp.pagination.MAX_PAGE_SIZE', 3)
+        body = streamed_json(client.get('/api/myapp/items?limit=1000'))
+        assert len(body['items']) == 3
+        assert body['next'] is not None
+
+    def test_invalid_cursor(self, client):
+        response = client.get('/api/myapp/items?cursor=not-a-cursor')
+        assert response.status_code == 400
+
+
+class TestItemSerializer:
+    """
+    the streaming serializer should produce exactly what json.dumps would, however the rows are chunked
+    """
+
+    @pytest.mark.parametrize("count, chunk_size", [(0, 2), (1, 2), (4, 2), (5, 2)])
+    def test_iter_json_array(self, count, chunk_size):
+        rows = [{"id": i, "name": f"Item {i}", "description": 'with "quotes"'} for i in range(count)]
+        body = "[" + "".join(iter_json_array(rows, chunk_size)) + "]"
+        assert json.loads(body) == rows
+
+
+@pytest.mark.django_db
+class TestItemBulkAPI:
+    """
+    /items/bulk takes arrays and reports a result per row, in request order
+    """
+
+    def test_bulk_create(self, client):
+        payload = [{"name": f"Item {i}", "description": f"Description {i}"} for i in range(5)]
+        response = client.post(
+            '/api/myapp/items/bulk?batch_size=2',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 201
+        results = response.json()['results']
+        assert [r['status'] for r in results] == ['created'] * 5
+        assert Item.objects.count() == 5
+        assert set(Item.objects.values_list('id', flat=True)) == {r['id'] for r in results}
+
+    def test_bulk_update_reports_missing_rows(self, client, create_sample_item):
+        payload = [
+            {"id": create_sample_item.id, "name": "Updated Item", "description": "Updated Description"},
+            {"id": 999, "name": "Ghost", "description": "Not there"},
+        ]
+        response = client.put(
+            '/api/myapp/items/bulk',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        assert [r['status'] for r in response.json()['results']] == ['updated', 'not_found']
+        assert Item.objects.get(id=create_sample_item.id).name == "Updated Item"
+        assert Item.objects.get(id=create_sample_item.id).version == create_sample_item.version + 1
+        assert Item.objects.count() == 1
+
+    def test_bulk_update_reports_duplicate_ids(self, client, create_sample_item):
+        payload = [
+            {"id": create_sample_item.id, "name": "First", "description": "Wins"},
+            {"id": create_sample_item.id, "name": "Second", "description": "Ignored"},
+        ]
+        response = client.put('/api/myapp/items/bulk', data=json.dumps(payload), content_type='application/json')
+
+        assert [r['status'] for r in response.json()['results']] == ['updated', 'duplicate']
+        assert response.json()['message'] == "1 items updated successfully"
+        item = Item.objects.get(id=create_sample_item.id)
+        assert (item.name, item.version) == ("First", create_sample_item.version + 1)
+
+    def test_bulk_delete(self, client, create_sample_item):
+        response = client.delete(
+            '/api/myapp/items/bulk',
+            data=json.dumps({"ids": [create_sample_item.id, 999]}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        assert [r['status'] for r in response.json()['results']] == ['deleted', 'not_found']
+        assert Item.objects.count() == 0
+
+    def test_bulk_delete_reports_duplicate_ids(self, client, create_sample_item):
+        response = client.delete(
+            '/api/myapp/items/bulk',
+            data=json.dumps({"ids": [create_sample_item.id, 999, create_sample_item.id, 999]}),
+            content_type='application/json'
+        )
+
+        assert [r['status'] for r in response.json()['results']] == ['deleted', 'not_found', 'duplicate', 'duplicate']
+        assert response.json()['message'] == "1 items deleted successfully"
+
+
+@pytest.mark.django_db
+class TestItemETag:
+    """
+    reads carry an ETag; sending it back as If-None-Match gets a 304 until a write bumps the version
+    """
+
+    def test_get_item_not_modified(self, client, create_sample_item):
+        etag = client.get(f'/api/myapp/items/{create_sample_item.id}')['ETag']
+
+        response = client.get(f'/api/myapp/items/{create_sample_item.id}', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_update_changes_item_etag(self, client, create_sample_item):
+        etag = client.get(f'/api/myapp/items/{create_sample_item.id}')['ETag']
+        client.put(
+            f'/api/myapp/items/{create_sample_item.id}',
+            data=json.dumps({"name": "Updated Item", "description": "Updated Description"}),
+            content_type='application/json'
+        )
+
+        response = client.get(f'/api/myapp/items/{create_sample_item.id}', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert response.json()['item']['name'] == "Updated Item"
+
+    def test_list_not_modified_until_write(self, client, create_sample_item):
+        etag = client.get('/api/myapp/items')['ETag']
+        assert client.get('/api/myapp/items', HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        client.post(
+            '/api/myapp/items',
+            data=json.dumps({"name": "Another Item", "description": "Another Description"}),
+            content_type='application/json'
+        )
+        response = client.get('/api/myapp/items', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert len(streamed_json(response)['items']) == 2
+
+    def test_model_writes_change_etags(self, client, create_sample_item):
+        list_etag = client.get('/api/myapp/items')['ETag']
+        item_etag = client.get(f'/api/myapp/items/{create_sample_item.id}')['ETag']
+
+        create_sample_item.name = "Saved from the shell"
+        create_sample_item.save(update_fields=["name"])
+        assert create_sample_item.version == 2
+        response = client.get(f'/api/myapp/items/{create_sample_item.id}', HTTP_IF_NONE_MATCH=item_etag)
+        assert response.status_code == 200
+        assert response.json()['item']['name'] == "Saved from the shell"
+        assert client.get('/api/myapp/items', HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+        list_etag = client.get('/api/myapp/items')['ETag']
+        Item.objects.create(name="Created from the shell", description="")
+        assert client.get('/api/myapp/items', HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+        list_etag = client.get('/api/myapp/items')['ETag']
+        create_sample_item.delete()
+        assert client.get('/api/myapp/items', HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+
+    def test_bulk_write_changes_list_etag(self, client, create_sample_item):
+        etag = client.get('/api/myapp/items')['ETag']
+        client.delete(
+            '/api/myapp/items/bulk',
+            data=json.dumps({"ids": [create_sample_item.id]}),
+            content_type='application/json'
+        )
+        assert client.get('/api/myapp/items', HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+class TestLRUCache:
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2, ttl=60)
+        cache.set("a", {"id": 1})
+        cache.set("b", {"id": 2})
+        cache.get("a")  # "b" is now the least recently used
+        cache.set("c", {"id": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"id": 1}
+        assert cache.get("c") == {"id": 3}
+
+    def test_entries_expire(self):
+        cache = LRUCache(max_size=2, ttl=-1)
+        cache.set("a", {"id": 1})
+        assert cache.get("a") is None
+
+
+@pytest.mark.django_db
+class TestItemCache:
+    """
+    get_item reads through the cache; writes invalidate it through post_save/post_delete
+    """
+
+    def test_second_read_is_a_local_hit(self, client, create_sample_item, django_assert_num_queries):
+        client.get(f'/api/myapp/items/{create_sample_item.id}')
+        before = item_cache.get_stats()
+
+        with django_assert_num_queries(0):
+            response = client.get(f'/api/myapp/items/{create_sample_item.id}')
+
+        assert response.json()['item']['name'] == create_sample_item.name
+        assert item_cache.get_stats()['local_hits'] == before['local_hits'] + 1
+
+    def test_save_invalidates(self, client, create_sample_item):
+        client.get(f'/api/myapp/items/{create_sample_item.id}')
+        create_sample_item.name = "Renamed"
+        create_sample_item.save()
+
+        response = client.get(f'/api/myapp/items/{create_sample_item.id}')
+        assert response.json()['item']['name'] == "Renamed"
+
+    def test_delete_invalidates(self, client, create_sample_item):
+        client.get(f'/api/myapp/items/{create_sample_item.id}')
+        client.delete(f'/api/myapp/items/{create_sample_item.id}')
+
+        assert client.get(f'/api/myapp/items/{create_sample_item.id}').status_code == 404
+
+    def test_shared_tier_is_filled_and_read(self):
+        shared = fakeredis.FakeRedis()
+        row = {"id": 1, "name": "Test Item", "description": "Test Description", "version": 1}
+        first = ReadThroughCache(KEY, shared=shared, local_max_size=100, local_ttl=60, shared_ttl=60)
+        assert first.get_or_load(1, lambda item_id: row) == row
+
+        # a second process: empty local tier, same Redis
+        second = ReadThroughCache(KEY, shared=shared, local_max_size=100, local_ttl=60, shared_ttl=60)
+        assert second.get_or_load(1, lambda item_id: pytest.fail("should not hit the db")) == row
+        assert second.get_stats()['shared_hits'] == 1
+
+        second.invalidate(1)
+        assert shared.keys() == []
+
+    def test_stale_fill_is_not_stored(self):
+        shared = fakeredis.FakeRedis()
+        cache = ReadThroughCache(KEY, shared=shared, local_max_size=100, local_ttl=60, shared_ttl=60)
+        old = {"id": 1, "name": "Old", "description": "", "version": 1}
+
+        def load_then_write(item_id):
+            # the SELECT saw the old row, then a write commits and invalidates before we store it
+            cache.invalidate(item_id)
+            return old
+
+        assert cache.get_or_load(1, load_then_write) == old
+        assert shared.get(KEY.format(1)) is None
+        assert cache.get_stats()['stale_fills'] == 1
+
+        cache.local.clear()
+        assert cache.get_or_load(1, lambda item_id: old) == old
+        assert shared.keys() == [KEY.format(1).encode()]
+
+    def test_stats_endpoint(self, client):
+        response = client.get('/api/myapp/cache/stats')
+        assert response.status_code == 200
+        assert {'local_hits', 'shared_hits', 'misses', 'hit_ratio'} <= response.json().keys()
+
+
+@pytest.mark.django_db
+class TestItemZeroFetchWrites:
+    """
+    PATCH / PUT / DELETE are a single UPDATE or DELETE on the row; the affected row count decides the 404
+    """
+
+    def test_patch_only_touches_sent_fields(self, client, create_sample_item):
+        response = client.patch(
+            f'/api/myapp/items/{create_sample_item.id}',
+            data=json.dumps({"name": "Patched Item"}),
+            content_type='application/json'
+        )
+
+        assert response.status_code == 200
+        # the row as written, with the bumped version and its ETag
+        assert response.json()['item'] == {"id": create_sample_item.id, "name": "Patched Item",
+                                           "description": create_sample_item.description,
+                                           "version": create_sample_item.version + 1}
+        get = client.get(f'/api/myapp/items/{create_sample_item.id}', HTTP_IF_NONE_MATCH=response['ETag'])
+        assert get.status_code == 304
+        item = Item.objects.get(id=create_sample_item.id)
+        assert item.name == "Patched Item"
+        assert item.description == create_sample_item.description
+        assert item.version == create_sample_item.version + 1
+
+    def test_update_without_returning(self, client, monkeypatch, create_sample_item):
+        # databases without UPDATE ... RETURNING read the row back after the UPDATE
+        monkeypatch.setattr(connection.features, "can_return_columns_from_insert", False)
+        response = client.put(
+            f'/api/myapp/items/{create_sample_item.id}',
+            data=json.dumps({"name": "Put Item", "description": "Put Description"}),
+            content_type='application/json'
+        )
+        assert response.json()['item'] == {"id": create_sample_item.id, "name": "Put Item",
+                                           "description": "Put Description", "version": 2}
+        assert client.put(
+            '/api/myapp/items/999',
+            data=json.dumps({"name": "Put Item", "description": "Put Description"}),
+            content_type='application/json'
+        ).status_code == 404
+
+    def test_patch_nonexistent_item(self, client):
+        response = client.patch(
+            '/api/myapp/items/999',
+            data=json.dumps({"name": "Patched Item"}),
+            content_type='application/json'
+        )
+        assert response.status_code == 404
+
+    def test_patch_without_fields(self, client, create_sample_item):
+        response = client.patch(
+            f'/api/myapp/items/{create_sample_item.id}',
+            data=json.dumps({}),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+
+    def test_patch_rejects_null_fields(self, client, create_sample_item):
+        response = client.patch(
+            f'/api/myapp/items/{create_sample_item.id}',
+            data=json.dumps({"name": None}),
+            content_type='application/json'
+        )
+        assert response.status_code == 422
+        item = Item.objects.get(id=create_sample_item.id)
+        assert item.name == create_sample_item.name
+        assert item.version == create_sample_item.version
+
+    def test_writes_never_select_the_item(self, client, create_sample_item):
+        with CaptureQueriesContext(connection) as queries:
+            client.patch(
+                f'/api/myapp/items/{create_sample_item.id}',
+                data=json.dumps({"name": "Patched Item"}),
+                content_type='application/json'
+            )
+            client.delete(f'/api/myapp/items/{create_sample_item.id}')
+
+        item_selects = [q['sql'] for q in queries if q['sql'].startswith('SELECT') and 'myapp_item' in q['sql']]
+        assert item_selects == []
+        assert Item.objects.count() == 0
+
+    def test_nothing_references_item(self):
+        # delete_items' single-statement DELETE relies on this; a new relation switches it to the
+        # cascading QuerySet.delete() - check that path (below) still does what the relation needs
+        assert not Item._meta.related_objects
+
+    def test_delete_falls_back_to_the_collector_once_item_is_referenced(self, monkeypatch, create_sample_item):
+        monkeypatch.setattr(Item._meta, "related_objects", (object(),))
+        monkeypatch.setattr(QuerySet, "_raw_delete", lambda *args: pytest.fail("cascades would be skipped"))
+
+        assert delete_items([create_sample_item.id, 999]) == 1
+        assert Item.objects.count() == 0
+
+    def test_patch_invalidates_cache(self, client, create_sample_item):
+        client.get(f'/api/myapp/items/{create_sample_item.id}')
+        client.patch(
+            f'/api/myapp/items/{create_sample_item.id}',
+            data=json.dumps({"name": "Patched Item"}),
+            content_type='application/json'
+        )
+        assert client.get(f'/api/myapp/items/{create_sample_item.id}').json()['item']['name'] == "Patched Item"
+
+
+@pytest.mark.django_db
+class TestItemSearch:
+    """
+    /items/search is backed by FTS5 (sqlite) or tsvector + GIN (postgres), kept in sync by the database
+    """
+
+    @pytest.fixture
+    def catalog(self):
+        return {
+            "kettle": Item.objects.create(name="Electric kettle", description="Boils water fast"),
+            "teapot": Item.objects.create(name="Teapot", description="Ceramic pot, pairs well with an electric kettle"),
+            "lamp": Item.objects.create(name="Desk lamp", description="Warm light"),
+        }
+
+    def search(self, client, query):
+        response = client.get('/api/myapp/items/search', {'q': query, 'limit': 10})
+        assert response.status_code == 200
+        return response.json()
+
+    def test_ranks_name_matches_first(self, client, catalog):
+        ids = [item['id'] for item in self.search(client, 'kettle')['items']]
+        assert ids == [catalog['kettle'].id, catalog['teapot'].id]
+
+    def test_index_follows_writes(self, client, catalog):
+        client.patch(
+            f'/api/myapp/items/{catalog["lamp"].id}',
+            data=json.dumps({"name": "Desk kettle"}),
+            content_type='application/json'
+        )
+        client.delete(f'/api/myapp/items/{catalog["teapot"].id}')
+
+        ids = {item['id'] for item in self.search(client, 'kettle')['items']}
+        assert ids == {catalog['kettle'].id, catalog['lamp'].id}
+
+    def test_pages_through_results(self, client):
+        Item.objects.bulk_create([Item(name=f"Kettle {i}", description="kettle") for i in range(5)])
+
+        seen = []
+        params = {'q': 'kettle', 'limit': 2}
+        while True:
+            body = client.get('/api/myapp/items/search', params).json()
+            seen += [item['id'] for item in body['items']]
+            if body['next'] is None:
+                break
+            params['cursor'] = body['next']
+
+        assert sorted(seen) == sorted(Item.objects.values_list('id', flat=True))
+        assert len(seen) == len(set(seen))
+
+    def test_operators_in_query_are_harmless(self, client, catalog):
+        assert self.search(client, 'kettle")(*')['items'][0]['id'] == catalog['kettle'].id
+
+
+    def test_unsupported_database_is_a_501(self, client, settings, monkeypatch):
+        monkeypatch.setitem(settings.DATABASES["default"], "ENGINE", "django.db.backends.mysql")
+        response = client.get('/api/myapp/items/search', {'q': 'kettle'})
+        assert response.status_code == 501
+        assert "not supported" in response.json()['message']
+
+    def test_migration_warns_when_it_creates_no_index(self):
+        migration = importlib.import_module('myapp.migrations.0003_item_search_index')
+        schema_editor = SimpleNamespace(connection=SimpleNamespace(vendor="mysql"),
+                                        execute=lambda sql: pytest.fail("nothing to run on mysql"))
+        with pytest.warns(UserWarning, match="search is unavailable"):
+            migration.run({"sqlite": migration.SQLITE_FORWARDS})(None, schema_editor)
+
+@pytest.mark.django_db
+class TestItemSparseFieldsets:
+    """
+    `?fields=` on the read endpoints: only the selected columns (and always id) are fetched and returned
+    """
+
+    def test_list_selects_only_requested_columns(self, client, create_sample_item):
+        with CaptureQueriesContext(connection) as queries:
+            body = streamed_json(client.get('/api/myapp/items?fields=name'))
+
+        assert body['items'] == [{"id": create_sample_item.id, "name": create_sample_item.name}]
+        page_query = [q['sql'] for q in queries if 'FROM "myapp_item"' in q['sql']][-1]
+        assert '"description"' not in page_query
+
+    def test_get_item_fields(self, client, create_sample_item):
+        response = client.get(f'/api/myapp/items/{create_sample_item.id}?fields=name')
+        assert response.json()['item'] == {"id": create_sample_item.id, "name": create_sample_item.name}
+
+        # a sparse read must not leave a partial row in the cache
+        full = client.get(f'/api/myapp/items/{create_sample_item.id}').json()['item']
+        assert full['description'] == create_sample_item.description
+
+    def test_sparse_etag_differs_from_full(self, client, create_sample_item):
+        full = client.get(f'/api/myapp/items/{create_sample_item.id}')['ETag']
+        sparse = client.get(f'/api/myapp/items/{create_sample_item.id}?fields=name')['ETag']
+        assert full != sparse
+
+    def test_search_fields(self, client, create_sample_item):
+        items = client.get('/api/myapp/items/search', {'q': 'test', 'fields': 'name'}).json()['items']
+        assert set(items[0]) == {"id", "name", "score"}
+
+    def test_unknown_field(self, client, create_sample_item):
+        assert client.get('/api/myapp/items?fields=price').status_code == 400
+        assert client.get(f'/api/myapp/items/{create_sample_item.id}?fields=price').status_code == 400
+
+
+@pytest.mark.django_db
+class TestItemExportImport:
+    """
+    /items/export streams NDJSON/CSV, /items/import reads it back in fixed-size batches
+    """
+
+    def test_export_ndjson(self, client, create_sample_item):
+        response = client.get('/api/myapp/items/export?format=ndjson&fields=name')
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert [json.loads(line) for line in lines] == [{"id": create_sample_item.id, "name": create_sample_item.name}]
+
+    def test_export_csv(self, client, create_sample_item):
+        response = client.get('/api/myapp/items/export?format=csv')
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == "id,name,description,version"
+        assert lines[1] == f"{create_sample_item.id},Test Item,Test Description,1"
+
+    def test_import_ndjson_in_batches(self, client):
+        body = "\n".join(
+            [json.dumps({"name": f"Item {i}", "description": "imported"}) for i in range(5)]
+            + ["not json", json.dumps({"description": "no name"}), ""]
+        )
+        response = client.post('/api/myapp/items/import?format=ndjson&batch_size=2', data=body,
+                                content_type='application/x-ndjson')
+
+        assert response.status_code == 201
+        summary = response.json()
+        assert (summary['imported'], summary['errors'], summary['batches']) == (5, 2, 3)
+        assert [sample['line'] for sample in summary['error_samples']] == [6, 7]
+        assert Item.objects.count() == 5
+
+    def test_export_then_import_csv(self, client, create_sample_item):
+        Item.objects.create(name="Comma, \"quoted\"", description="two\nlines")
+        exported = b"".join(client.get('/api/myapp/items/export?format=csv').streaming_content)
+        Item.objects.all().delete()
+
+        response = client.post('/api/myapp/items/import?format=csv', data=exported, content_type='text/csv')
+
+        assert response.json()['imported'] == 2
+        assert set(Item.objects.values_list('name', 'description')) == {
+            ("Test Item", "Test Description"),
+            ("Comma, \"quoted\"", "two\nlines"),
+        }
+
+    def test_import_csv_reports_bad_lines(self, client):
+        body = (
+            b'name,description\n'
+            b'First,"two\nlines"\n'
+            b'\xff\xfe,not utf-8\n'
+            b',no name\n'
+            b'Last,after the bad ones\n'
+        )
+        response = client.post('/api/myapp/items/import?format=csv', data=body, content_type='text/csv')
+
+        assert response.status_code == 201
+        summary = response.json()
+        assert (summary['imported'], summary['errors']) == (2, 2)
+        assert summary['error_samples'] == [
+            {"line": 4, "error": "invalid UTF-8"},
+            {"line": 5, "error": "name is required"},
+        ]
+        assert set(Item.objects.values_list('name', flat=True)) == {"First", "Last"}
+
+    def test_parse_csv_survives_csv_errors(self):
+        limit = csv.field_size_limit(12)
+        try:
+            rows = list(parse_csv([b'name,description\n', b'x,' + b'y' * 50 + b'\n', b'z,ok\n']))
+        finally:
+            csv.field_size_limit(limit)
+        assert [number for number, _ in rows] == [2, 3]
+        assert isinstance(rows[0][1], ValueError)
+        assert rows[1][1] == {"name": "z", "description": "ok"}
+
+    def test_unsupported_format(self, client):
+        assert client.get('/api/myapp/items/export?format=xml').status_code == 400
+
+
+class TestItemSSE:
+
+    def test_ticker_event(self):
+        event = ticker_event()
+        assert event.startswith("data: ") and event.endswith("\n\n")
+        assert 1 <= json.loads(event[len("data: "):])['value'] <= 100
+
+    def test_clients_share_one_ticker(self):
+        async def first_events(count):
+            streams = [ticker.stream() for _ in range(count)]
+            events = [await stream.__anext__() for stream in streams]
+            for stream in streams:
+                await stream.aclose()
+            return events
+
+        events = async_to_sync(first_events)(3)
+        assert len(set(events)) == 1  # the same tick, produced once
+        assert ticker.get_stats()['subscribers'] == 0
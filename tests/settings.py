@@ -47,7 +47,8 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     'ninja',
-    "myapp"
+    "myapp",
+    "my_sse_app",
 ]
 
 MIDDLEWARE = [
@@ -96,6 +97,10 @@ DATABASES = {
         'PORT': env('DB_PORT', default=os.getenv('DB_PORT', '5432')),
     }
 }
+if DATABASES['default']['ENGINE'].endswith('sqlite3'):
+    # ! a file instead of the in-memory test db: task runs write from several threads at once,
+    # ! and shared-cache in-memory sqlite fails them with "table is locked" instead of waiting
+    DATABASES['default']['TEST'] = {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')}
 print(DATABASES)
 
 # Password validation